@@ -1,13 +1,29 @@
+import collections
+import os
+import tempfile
 import streamlit as st
 import pandas as pd
-import concurrent.futures
 from src.ui.styles import apply_custom_styles
-from src.core.extractor import process_single_pdf
-from src.utils.file_handler import to_excel
+from src.core.pool import SharedPool
+from src.core.preflight import ERRORS
+from src.core.records import ERROR_FIELDS, OCR_FIELDS, ResultColumns
+from src.core.scheduler import MicroBatcher, build_submit, result_of, run_windowed
+from src.core.cache import DEFAULT_PATH as DEFAULT_CACHE_PATH
+from src.core.timing import BatchTimings
+from src.utils.file_handler import iter_uploaded_pdfs, to_excel
 
 # Apply global styles
 apply_custom_styles()
 
+@st.cache_resource
+def get_shared_pool():
+    """One extraction pool per server process, shared by every browser session."""
+    return SharedPool.from_env()
+
+pool = get_shared_pool()
+# Content-hash result cache, opened inside the pool workers (memory LRU + SQLite on disk)
+cache_path = os.environ.get("PDF2EMAIL_CACHE_PATH", DEFAULT_CACHE_PATH)
+
 # ==========================================
 # UI LAYOUT
 # ==========================================
@@ -25,12 +41,18 @@ with col1:
         help="If checked, files without any extracted emails will not be added to the final list."
     )
 with col2:
-    max_workers = st.slider(
-        "Parallel Processing Threads", 
+    max_in_flight = st.slider(
+        "Files In Flight", 
         min_value=1, 
         max_value=500, 
         value=64,
-        help="Higher values process files faster. Recommended: 100+ for large batches on high-core VPS."
+        help="How many files this run keeps queued on the shared pool. Shrinks automatically when server memory runs low."
+    )
+    # Pool size is a server setting (PDF2EMAIL_* env vars), shared fairly between users
+    st.caption(
+        f"⚙️ Shared pool: {pool.max_workers} {pool.backend} workers · "
+        f"{pool.max_sessions} concurrent sessions · {pool.waiting_sessions} waiting"
+        + (f" · {pool.timeout:g}s per-file limit" if pool.timeout else "")
     )
 
 uploaded_files = st.file_uploader("Upload PDFs or ZIP", type=["pdf", "zip"], accept_multiple_files=True)
@@ -39,85 +61,60 @@ if uploaded_files:
     st.divider()
     
     total_files = len(uploaded_files)
-    results = []
+    # Rows are stored by column (see ResultColumns); image-only scans have no
+    # text layer and are listed apart so they can be sent to OCR
+    results = ResultColumns()
+    needs_ocr = []  # file names
+    errors = []  # ErrorRecord, one per failed file
     
     # Logic for parallel processing
     if st.button("🚀 Start High-Speed Extraction"):
         import time
-        import zipfile
-        from io import BytesIO
-        import gc
         
         start_time = time.time()
         progress_bar = st.progress(0)
         status_text = st.empty()
         
-        # --- Memory-Safe File Data Generator ---
-        def get_file_data(uploaded_files):
-            for f in uploaded_files:
-                if f.name.endswith(".zip"):
-                    try:
-                        with zipfile.ZipFile(BytesIO(f.getvalue())) as z:
-                            for name in z.namelist():
-                                if name.lower().endswith(".pdf"):
-                                    # Yield one file at a time to save memory
-                                    yield z.read(name), name
-                    except Exception as ze:
-                        st.error(f"Error reading ZIP {f.name}: {ze}")
-                else:
-                    yield f.getvalue(), f.name
-
-        # For progress tracking, we still need a total count
-        # This is a trade-off: counting first vs estimating
-        # We'll estimate based on uploaded_files or count if not too large
-        status_text.text("Scanning upload for PDFs...")
-        
-        # Convert generator to a list in small chunks or just process directly
-        # To avoid RAM spike, we'll process in chunks of 50
-        CHUNK_SIZE = 50
-        all_file_data_gen = get_file_data(uploaded_files)
-        
+        # Continuous window: keep files in flight and refill as each one finishes,
+        # bounded by job count and by PDF bytes held in memory (512 MB)
+        MAX_BYTES_IN_FLIGHT = 512 * 1024 * 1024
         completed = 0
-        total_found = 0
+        cache_hits = 0
+        timings = BatchTimings()
         
-        # We'll use a loop to pull chunks from the generator and process them
-        while True:
-            chunk = []
-            try:
-                for _ in range(CHUNK_SIZE):
-                    chunk.append(next(all_file_data_gen))
-            except StopIteration:
-                pass
-            
-            if not chunk:
-                break
-                
-            total_found += len(chunk)
-            status_text.text(f"Processing batch of {len(chunk)} (Total: {total_found})...")
-            
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_file = {
-                    executor.submit(process_single_pdf, data, name, exclude_no_email): name 
-                    for data, name in chunk
-                }
+        # Reserve a slot on the shared pool; queue behind other users if the server is busy
+        status_text.text("Waiting for a free extraction slot...")
+        with tempfile.TemporaryDirectory(prefix="pdf2email-") as spill_dir, pool.session() as session:
+            # Memory-safe: one PDF at a time. ZIPs are spilled to disk once and
+            # each worker inflates its own member, so decompression runs in parallel
+            all_file_data_gen = iter_uploaded_pdfs(
+                uploaded_files, spill_dir, on_error=lambda name, ze: st.error(f"Error reading ZIP {name}: {ze}")
+            )
+            # Files with (almost) no fitz text are retried with pdfplumber on the fallback pool;
+            # with process workers, large PDFs travel through shared memory instead of being pickled
+            fallback = pool.fallback.submit if pool.fallback is not None else None
+            submit = build_submit(session.submit, fallback, exclude_no_email, cache_path, pool.backend == "process", spill_dir)
+            # Tiny PDFs are grouped into micro-batches (one pool task each)
+            scheduled = run_windowed(submit, all_file_data_gen, max_in_flight, MAX_BYTES_IN_FLIGHT, batcher=MicroBatcher())
+            for file_name, future in scheduled:
+                # Timed-out and crashed files come back as ErrorRecords, so none is lost silently
+                res, meta = result_of(future, file_name)
+                for row in res:
+                    results.append(row)
+                if "image_only" in meta["notes"]:
+                    needs_ocr.append(file_name)
+                if meta["error"] is not None:
+                    errors.append(meta["error"])
+                timings.add(meta["stages"], meta["notes"])
+                cache_hits += meta["cache_hit"]
                 
-                for future in concurrent.futures.as_completed(future_to_file):
-                    file_name = future_to_file[future]
-                    try:
-                        res = future.result()
-                        results.extend(res)
-                    except Exception as exc:
-                        st.error(f"Error in {file_name}: {exc}")
-                        print(f"ERROR: {file_name} -> {exc}") # Server-side log
-                    
-                    completed += 1
-                    # Update progress bar occasionally
-                    if completed % 10 == 0:
-                        progress_bar.progress(min(completed / (len(uploaded_files) * 5), 0.99)) # Estimated progress
-            
-            # Explicit Garbage Collection after each chunk
-            del chunk
-            gc.collect()
+                completed += 1
+                # Update progress bar occasionally
+                if completed % 10 == 0:
+                    progress_bar.progress(min(completed / (len(uploaded_files) * 5), 0.99)) # Estimated progress
+                    status_text.text(f"Processed {completed} files...")
+
+        total_found = completed
 
         duration = time.time() - start_time
         status_text.empty()
@@ -125,35 +122,80 @@ if uploaded_files:
         
         if total_found > 0:
             st.success(f"✅ Processed {total_found} files in {duration:.2f} seconds ({total_found/duration:.1f} files/sec)")
+            st.info(f"♻️ Cache: {cache_hits} of {total_found} files served from cache ({cache_hits / total_found:.0%} hit rate)")
+            tiers = timings.tiers()
+            if len(tiers) > 1:
+                st.info("🧱 Extraction tiers: " + " · ".join(
+                    f"{t['Tier']} {t['Files']} files ({t['Total (s)']:.2f}s, {t['Mean (ms)']:.0f} ms/file)" for t in tiers
+                ))
+            zero_text = timings.notes.get("zero_text", 0)
+            if zero_text:
+                st.info(f"⚡ {zero_text} of {total_found} files ({zero_text / total_found:.0%}) resolved from links and metadata without reading page text")
+            failed = collections.Counter(error.code for error in errors)
+            if failed["timeout"]:
+                st.warning(f"⏱️ {failed['timeout']} files exceeded the {pool.timeout:g}s per-file limit and are listed under Errors")
+            unusable = [(code, n) for code, n in failed.most_common() if code != "timeout"]
+            if unusable:
+                st.warning("🚫 Unusable files: " + " · ".join(f"{ERRORS[code]}: {n}" for code, n in unusable))
+            if timings.timed_files:
+                with st.expander(f"⏱️ Stage timings ({timings.timed_files} files)"):
+                    st.dataframe(pd.DataFrame(timings.summary()), use_container_width=True, hide_index=True)
+                    if tiers:
+                        st.dataframe(pd.DataFrame(tiers), use_container_width=True, hide_index=True)
         else:
             st.warning("No PDFs found to process.")
 
         # --- Display Results ---
-        if results:
-            df = pd.DataFrame(results)
+        if results or needs_ocr:
             st.success(f"✅ Successfully processed {total_files} files.")
 
-            # Interactive Table
-            st.dataframe(
-                df,
-                use_container_width=True,
-                column_config={
-                    "File Name": st.column_config.TextColumn("File Name", width="medium"),
-                    "Exact Title": st.column_config.TextColumn("Document Title", width="large"),
-                    "Email": st.column_config.TextColumn("Email Address", width="medium"),
-                }
-            )
+            if results:
+                df = results.to_frame()
+                # Interactive Table
+                st.dataframe(
+                    df,
+                    use_container_width=True,
+                    column_config={
+                        "File Name": st.column_config.TextColumn("File Name", width="medium"),
+                        "Exact Title": st.column_config.TextColumn("Document Title", width="large"),
+                        "Email": st.column_config.TextColumn("Email Address", width="medium"),
+                    }
+                )
 
-            # Download Button
-            excel_data = to_excel(df)
-            st.download_button(
-                label="⬇️ Download Results (Excel)",
-                data=excel_data,
-                file_name="extracted_emails_titles.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+                # Download Button
+                excel_data = to_excel(df)
+                st.download_button(
+                    label="⬇️ Download Results (Excel)",
+                    data=excel_data,
+                    file_name="extracted_emails_titles.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
+
+            if needs_ocr:
+                ocr_df = pd.DataFrame(needs_ocr, columns=OCR_FIELDS)
+                st.warning(f"🖼️ {len(ocr_df)} image-only files have no text layer and need OCR")
+                with st.expander(f"🖼️ Needs OCR ({len(ocr_df)} files)"):
+                    st.dataframe(ocr_df, use_container_width=True, hide_index=True)
+                    st.download_button(
+                        label="⬇️ Download OCR list (CSV)",
+                        data=ocr_df.to_csv(index=False).encode("utf-8"),
+                        file_name="needs_ocr.csv",
+                        mime="text/csv"
+                    )
         else:
             st.warning("No data could be extracted from the uploaded files.")
 
+        if errors:
+            # Failed files are kept out of the results table, with a machine-readable code each
+            errors_df = pd.DataFrame.from_records([e.as_tuple() for e in errors], columns=ERROR_FIELDS)
+            with st.expander(f"🚫 Errors ({len(errors)} files)"):
+                st.dataframe(errors_df, use_container_width=True, hide_index=True)
+                st.download_button(
+                    label="⬇️ Download error list (CSV)",
+                    data=errors_df.to_csv(index=False).encode("utf-8"),
+                    file_name="errors.csv",
+                    mime="text/csv"
+                )
+
 else:
     st.info("👆 Upload files to begin extraction.")
@@ -0,0 +1,44 @@
+"""
+Threads vs processes throughput comparison for process_single_pdf.
+
+Usage:
+    python -m benchmarks.backends [corpus dir or .zip] [--workers 16] [--repeat 3]
+
+Without a corpus path, the synthetic corpus from benchmarks.corpus is used.
+"""
+import concurrent.futures
+import os
+import time
+
+from benchmarks.common import corpus_parser, load_jobs
+from benchmarks.run import timed_extract
+from src.core.pool import BACKENDS, create_executor
+
+def run_backend(backend, jobs, workers):
+    """Runs the whole corpus once and returns (seconds, rows). Pool start-up is excluded."""
+    with create_executor(backend, workers) as executor:
+        # Warm the pool so spawn + imports are not counted as extraction time
+        list(executor.map(timed_extract, [jobs[0][0]] * workers, [jobs[0][1]] * workers))
+
+        start = time.perf_counter()
+        futures = [executor.submit(timed_extract, data, name) for data, name in jobs]
+        rows = sum(len(f.result()[1]) for f in concurrent.futures.as_completed(futures))
+        return time.perf_counter() - start, rows
+
+def main():
+    parser = corpus_parser(__doc__, count=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    jobs = load_jobs(args)
+    if not jobs:
+        raise SystemExit(f"No PDFs found in {args.corpus}")
+    print(f"Corpus: {len(jobs)} PDFs, {sum(len(d) for d, _ in jobs) / 1e6:.1f} MB, workers={args.workers}")
+
+    for backend in BACKENDS:
+        best = min(run_backend(backend, jobs, args.workers) for _ in range(args.repeat))
+        seconds, rows = best
+        print(f"{backend:>8}: {len(jobs) / seconds:8.1f} files/sec  ({seconds:.2f}s, {rows} rows)")
+
+if __name__ == "__main__":
+    main()
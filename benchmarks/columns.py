@@ -0,0 +1,89 @@
+"""
+Peak memory of collecting results and building the UI DataFrame.
+
+Receives the rows of a large run the way app.py does (one pickled result
+per file) and builds the DataFrame handed to st.dataframe, three ways:
+- dicts:    list of row dicts, then pd.DataFrame(results)
+- records:  list of ResultRow, then DataFrame.from_records
+- columns:  ResultColumns.append per row, then to_frame() over its buffers
+
+Reports the traced memory held once the DataFrame exists and the peak
+during the run (tracemalloc; Arrow's own allocations are added from
+pyarrow.total_allocated_bytes()), and the time of an untraced run. No
+PDFs are parsed.
+
+Usage:
+    python -m benchmarks.columns [--rows 500000] [--unknown-title 0.2]
+"""
+import argparse
+import gc
+import pickle
+import time
+import tracemalloc
+
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks.records import as_dicts, as_records, synthetic_files
+from src.core.records import FIELDS, ResultColumns
+
+def collect_dicts(payloads):
+    results = []
+    for payload in payloads:
+        results.extend(pickle.loads(payload))
+    return pd.DataFrame(results)
+
+def collect_records(payloads):
+    results = []
+    for payload in payloads:
+        results.extend(pickle.loads(payload))
+    return pd.DataFrame.from_records([r.as_tuple() for r in results], columns=FIELDS)
+
+def collect_columns(payloads):
+    # Row by row, as app.py fills it
+    results = ResultColumns()
+    for payload in payloads:
+        for row in pickle.loads(payload):
+            results.append(row)
+    return results.to_frame()
+
+MODES = (
+    ("dicts", as_dicts, collect_dicts),
+    ("records", as_records, collect_records),
+    ("columns", as_records, collect_columns),
+)
+
+def run_mode(files, make, collect):
+    """Bytes held with the DataFrame alive and peak bytes (traced run), and seconds (untraced run)."""
+    payloads = [pickle.dumps(make(*f)) for f in files]
+    start = time.perf_counter()
+    collect(payloads)
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    arrow_before = pa.total_allocated_bytes()
+    tracemalloc.start()
+    df = collect(payloads)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arrow = pa.total_allocated_bytes() - arrow_before
+    del df
+    return held + arrow, peak + arrow, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--unknown-title", type=float, default=0.2, help="Share of files without a title")
+    args = parser.parse_args()
+
+    files = synthetic_files(args.rows, args.unknown_title)
+    print(f"{args.rows} rows from {len(files)} files")
+    for label, make, collect in MODES:
+        held, peak, elapsed = run_mode(files, make, collect)
+        print(
+            f"  {label:<8}: {held / 1024 / 1024:7.1f} MB held ({held / args.rows:6.1f} B/row)"
+            f"  {peak / 1024 / 1024:7.1f} MB peak  {elapsed:6.2f}s"
+        )
+
+if __name__ == "__main__":
+    main()
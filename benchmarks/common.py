@@ -0,0 +1,39 @@
+"""
+Scaffolding shared by the benchmarks that compare extractor modes or pool
+backends: the corpus/--count/--repeat command line, loading the corpus (or
+generating a synthetic one) and the best-of-repeat timing loop.
+"""
+import argparse
+import time
+
+import fitz
+
+from benchmarks.corpus import generate_corpus, load_corpus
+
+def corpus_parser(description, count=300, repeat=3, corpus=True, count_help="Synthetic papers when no corpus is given"):
+    """ArgumentParser with an optional corpus path (unless corpus=False), --count and --repeat."""
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    if corpus:
+        parser.add_argument("corpus", nargs="?", help="Directory of PDFs or a ZIP archive")
+    parser.add_argument("--count", type=int, default=count, help=count_help)
+    parser.add_argument("--repeat", type=int, default=repeat)
+    return parser
+
+def load_jobs(args):
+    """(data, name) jobs: the corpus given on the command line, else `args.count` synthetic papers."""
+    if getattr(args, "corpus", None):
+        return load_corpus(args.corpus)
+    return [(data, name) for data, name, _ in generate_corpus(args.count)]
+
+def open_docs(jobs):
+    return [fitz.open(stream=data, filetype="pdf") for data, _ in jobs]
+
+def best_of(fn, items, repeat):
+    """Best-of-`repeat` seconds to run fn over every item, and the outputs of the last run."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = [fn(item) for item in items]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
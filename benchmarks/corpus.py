@@ -0,0 +1,166 @@
+"""
+Reproducible synthetic paper corpus built with fitz.
+
+Usage:
+    python -m benchmarks.corpus out_dir/ [--count 500] [--seed 0]
+"""
+import argparse
+import os
+import random
+import zipfile
+
+import fitz
+
+WORDS = (
+    "analysis method results model data system learning network study performance "
+    "approach framework evaluation robust efficient novel adaptive distributed sparse"
+).split()
+
+# Where the email addresses are printed
+EMAIL_POSITIONS = ("header", "footnote", "last_page", "none")
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+def _image_pixmap(rng):
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 120, 160), False)
+    pix.clear_with(rng.randrange(150, 250))
+    return pix
+
+def _link_addresses(page, y, addresses):
+    """Clickable mailto: links over the address line printed at baseline `y`."""
+    for i, address in enumerate(addresses):
+        rect = fitz.Rect(72 + i * 60, y - 9, 72 + (i + 1) * 60, y + 2)
+        page.insert_link({"kind": fitz.LINK_URI, "from": rect, "uri": "mailto:" + address})
+
+def make_paper(
+    seed=0,
+    pages=6,
+    title_size=20.0,
+    emails=2,
+    email_position="header",
+    metadata_title=False,
+    image_only_pages=0,
+    figure=False,
+    mailto_links=False,
+    unlinked=0,
+    dense=False,
+):
+    """
+    Builds one paper as PDF bytes. Every feature that steers the extractor is
+    a parameter: page count, title font size, number and position of emails
+    (optionally as mailto: links, all but the last `unlinked` of them, as
+    papers often link only some addresses), a metadata title, trailing
+    image-only (scanned-looking) pages, a figure in the body of page 1 and a
+    dense body (6 pt type, ~2.5x the words, like proceedings papers).
+    """
+    rng = random.Random(seed)
+    title = _sentence(rng, rng.randint(5, 10)).title()
+    addresses = [f"{rng.choice(WORDS)}.{i}{seed}@univ{rng.randint(1, 9)}.edu" for i in range(emails)]
+    linked = addresses[:max(0, len(addresses) - unlinked)]
+
+    doc = fitz.open()
+    text_pages = max(0, pages - image_only_pages)
+    for pno in range(pages):
+        page = doc.new_page()
+        if pno >= text_pages:
+            # Scanned page: one full-page image, no text layer
+            page.insert_image(page.rect, pixmap=_image_pixmap(rng))
+            continue
+
+        y = 72
+        if pno == 0:
+            page.insert_textbox(fitz.Rect(72, y, 540, y + 4 * title_size), title, fontsize=title_size)
+            y += 4 * title_size + 10
+            page.insert_text((72, y), f"{_sentence(rng, 3).title()} University", fontsize=10)
+            y += 16
+            if email_position == "header" and addresses:
+                page.insert_text((72, y), "Email: " + ", ".join(addresses), fontsize=9)
+                if mailto_links:
+                    _link_addresses(page, y, linked)
+                y += 16
+            y += 10
+
+        if pno == 0 and figure:
+            page.insert_image(fitz.Rect(316, y, 540, y + 180), pixmap=_image_pixmap(rng))
+            y += 190
+
+        # Body text in two columns
+        words, fontsize = (260 if pno else 200), 8
+        if dense:
+            words, fontsize = words * 5 // 2, 6
+        for x in (72, 316):
+            page.insert_textbox(fitz.Rect(x, y, x + 224, 740), _sentence(rng, words), fontsize=fontsize)
+
+        if pno == 0 and email_position == "footnote" and addresses:
+            page.insert_text((72, 770), "* Corresponding author: " + "; ".join(addresses), fontsize=7)
+            if mailto_links:
+                _link_addresses(page, 770, linked)
+        if pno == text_pages - 1 and email_position == "last_page" and addresses:
+            page.insert_text((72, 770), "Correspondence: " + ", ".join(addresses), fontsize=7)
+            if mailto_links:
+                _link_addresses(page, 770, linked)
+
+    # Fixed dates and file ID keep the output byte-for-byte reproducible
+    doc.set_metadata({
+        "title": title if metadata_title else "",
+        "creationDate": "D:20240101000000",
+        "modDate": "D:20240101000000",
+    })
+    data = doc.tobytes(garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+    return data
+
+def random_features(rng):
+    """A realistic mix: mostly short papers with header emails, some long, some scanned."""
+    pages = rng.choice([1, 2, 4, 6, 8, 12, 20, 40])
+    return {
+        "pages": pages,
+        "title_size": rng.choice([14.0, 16.0, 18.0, 20.0, 24.0]),
+        "emails": rng.choice([0, 1, 1, 2, 2, 3, 5]),
+        "email_position": rng.choice(EMAIL_POSITIONS),
+        "metadata_title": rng.random() < 0.4,
+        "image_only_pages": pages if rng.random() < 0.1 else 0,
+        "figure": rng.random() < 0.3,
+        "mailto_links": rng.random() < 0.3,
+        "unlinked": rng.choice([0, 0, 1]),
+    }
+
+def generate_corpus(count=200, seed=0):
+    """Yields (data, name, features) for `count` papers. Same seed, same bytes."""
+    rng = random.Random(seed)
+    for i in range(count):
+        features = random_features(rng)
+        yield make_paper(seed=seed * 1_000_003 + i, **features), f"paper_{i:05d}.pdf", features
+
+def load_corpus(path):
+    """Loads every PDF under a directory (or inside a ZIP) into memory as (bytes, name) jobs."""
+    jobs = []
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as z:
+            for name in z.namelist():
+                if name.lower().endswith(".pdf"):
+                    jobs.append((z.read(name), name))
+    else:
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.lower().endswith(".pdf"):
+                    with open(os.path.join(root, name), "rb") as fh:
+                        jobs.append((fh.read(), name))
+    return jobs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for data, name, _ in generate_corpus(args.count, args.seed):
+        with open(os.path.join(args.out_dir, name), "wb") as fh:
+            fh.write(data)
+    print(f"Wrote {args.count} papers to {args.out_dir}")
+
+if __name__ == "__main__":
+    main()
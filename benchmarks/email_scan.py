@@ -0,0 +1,62 @@
+"""
+Email search on dense two-column pages: full-page regex vs '@'-anchored.
+
+Three ways to find the addresses on a page:
+- full:      get_text("text") + EMAIL_RE.findall over the whole page
+- anchored:  get_text("text") + _find_emails (regex only from each '@')
+- clip:      search_for("@") + get_text("text", clip=line) around each hit
+
+Usage:
+    python -m benchmarks.email_scan [--count 40] [--repeat 5]
+"""
+import random
+
+import fitz
+
+from benchmarks.common import best_of, corpus_parser
+from benchmarks.corpus import EMAIL_POSITIONS, make_paper
+from src.core.extractor import EMAIL_RE, _find_emails
+
+def full_page(page):
+    return EMAIL_RE.findall(page.get_text("text"))
+
+def anchored(page):
+    return _find_emails(page.get_text("text"))
+
+def clip(page):
+    found = []
+    for hit in page.search_for("@"):
+        line = fitz.Rect(page.rect.x0, hit.y0 - 1, page.rect.x1, hit.y1 + 1)
+        found += EMAIL_RE.findall(page.get_text("text", clip=line))
+    return sorted(set(found))
+
+MODES = {"full": full_page, "anchored": anchored, "clip": clip}
+
+def main():
+    args = corpus_parser(__doc__, count=40, repeat=5, corpus=False, count_help="Dense 6-page papers to generate").parse_args()
+
+    rng = random.Random(0)
+    docs = [
+        fitz.open(stream=make_paper(seed=i, emails=rng.randint(1, 4), email_position=rng.choice(EMAIL_POSITIONS[:3]), dense=True))
+        for i in range(args.count)
+    ]
+    pages = [page for doc in docs for page in doc]
+    texts = [page.get_text("text") for page in pages]
+    print(f"{len(pages)} dense pages, {sum(map(len, texts)) / len(texts):.0f} chars each")
+
+    # 1. Regex stage alone, on text that is already extracted
+    regex_s, regex_out = best_of(EMAIL_RE.findall, texts, args.repeat)
+    anchor_s, anchor_out = best_of(_find_emails, texts, args.repeat)
+    print(f"  regex stage   full: {regex_s / len(texts) * 1000:7.3f} ms/page")
+    print(f"  regex stage anchor: {anchor_s / len(texts) * 1000:7.3f} ms/page  ({regex_s / anchor_s:.0f}x, same matches: {regex_out == anchor_out})")
+
+    # 2. End to end per page, text layout included
+    baseline = None
+    for label, fn in MODES.items():
+        seconds, out = best_of(fn, pages, args.repeat)
+        found = sum(len(set(o)) for o in out)
+        baseline = baseline or seconds
+        print(f"  {label:>8} page: {seconds / len(pages) * 1000:7.3f} ms/page  ({baseline / seconds:.2f}x vs full, {found} addresses)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Time saved by computing titles only for files that are kept.
+
+With exclude_no_email=True, files without an email are dropped, so their
+title is never computed. The same corpus run with exclude_no_email=False
+pays for every title, as every run did before, and gives the eager baseline.
+The default corpus is mostly email-free papers without a metadata title,
+which is where the visual title fallback used to be wasted.
+
+Usage:
+    python -m benchmarks.lazy_title [--count 300] [--email-share 0.2] [--repeat 3]
+"""
+import random
+
+import fitz
+
+from benchmarks.common import best_of, corpus_parser
+from benchmarks.corpus import make_paper
+from src.core.extractor import extract_from_doc
+from src.core.timing import BatchTimings, StageTimer
+
+def run(docs, exclude_no_email, repeat):
+    """Best-of-`repeat` seconds and the stage totals of the last run."""
+    def extract(doc):
+        timer = StageTimer()
+        extract_from_doc(doc, exclude_no_email, timer)
+        return timer.stages
+
+    seconds, stages = best_of(extract, docs, repeat)
+    timings = BatchTimings()
+    for file_stages in stages:
+        timings.add(file_stages)
+    return seconds, timings
+
+def main():
+    parser = corpus_parser(__doc__, corpus=False, count_help="Synthetic papers to generate")
+    parser.add_argument("--email-share", type=float, default=0.2, help="Share of papers that print an email")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    docs = [
+        fitz.open(stream=make_paper(
+            seed=i,
+            pages=rng.choice([2, 4, 6, 8]),
+            emails=2 if rng.random() < args.email_share else 0,
+            figure=rng.random() < 0.3,
+        ))
+        for i in range(args.count)
+    ]
+
+    eager_s, eager = run(docs, False, args.repeat)
+    lazy_s, lazy = run(docs, True, args.repeat)
+    print(f"{len(docs)} papers, {args.email_share:.0%} with emails, none with a metadata title")
+    print(f"  eager title: {eager_s / len(docs) * 1000:7.3f} ms/file  ({eager.files.get('visual_title', 0)} titles computed)")
+    print(f"  lazy title : {lazy_s / len(docs) * 1000:7.3f} ms/file  ({lazy.files.get('visual_title', 0)} titles computed)")
+    print(f"  saved      : {(eager_s - lazy_s) / eager_s:.1%}")
+
+if __name__ == "__main__":
+    main()
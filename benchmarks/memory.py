@@ -0,0 +1,98 @@
+"""
+Worker memory over time: plain process pool vs recycled workers.
+
+Samples the summed RSS of all pool workers while a long stream of PDFs is
+extracted, once with long-lived workers and once with worker recycling
+(and MuPDF store emptying) enabled.
+
+Usage:
+    python -m benchmarks.memory [corpus dir or .zip] [--files 20000] [--recycle-files 2000] [-o rss.csv]
+
+The CSV (config, seconds, files, rss_mb) plots directly as RSS-over-time lines.
+"""
+import argparse
+import csv
+import os
+import threading
+import time
+
+from benchmarks.corpus import generate_corpus, load_corpus
+from src.core.jobs import run_job
+from src.core.pool import create_executor, process_rss
+from src.core.scheduler import run_windowed
+
+def child_pids():
+    """Pids of this process's children, found through /proc/<pid>/stat."""
+    me = os.getpid()
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as fh:
+                # The command name may contain spaces; the ppid follows its closing parenthesis
+                ppid = int(fh.read().rpartition(")")[2].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        if ppid == me:
+            pids.append(int(entry))
+    return pids
+
+def run_config(label, jobs, files, workers, interval, **limits):
+    """Streams `files` jobs (cycling through `jobs`) and returns [(seconds, files done, rss MB)]."""
+    samples = []
+    done = [0]
+    stop = threading.Event()
+
+    def sample(start):
+        while not stop.wait(interval):
+            rss = sum(process_rss(pid) for pid in child_pids()) / 1024 / 1024
+            samples.append((time.perf_counter() - start, done[0], rss))
+
+    stream = (jobs[i % len(jobs)] for i in range(files))
+    with create_executor("process", workers, **limits) as executor:
+        submit = lambda source, name: executor.submit(run_job, source, name, True, None)
+        start = time.perf_counter()
+        sampler = threading.Thread(target=sample, args=(start,), daemon=True)
+        sampler.start()
+        for _, future in run_windowed(submit, stream, workers * 4):
+            future.result()
+            done[0] += 1
+        stop.set()
+        sampler.join()
+
+    step = max(1, len(samples) // 8)
+    print(f"{label}: {files} files in {time.perf_counter() - start:.1f}s, "
+          f"{getattr(executor, 'recycles', 0)} pool recycles")
+    for seconds, count, rss in samples[::step] + samples[-1:]:
+        print(f"  {seconds:7.1f}s {count:7d} files {rss:8.1f} MB")
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="?", help="Directory of PDFs or a ZIP archive")
+    parser.add_argument("--files", type=int, default=20000, help="Files to stream (the corpus is cycled)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--recycle-files", type=int, default=2000)
+    parser.add_argument("--recycle-mb", type=int, default=1024)
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between RSS samples")
+    parser.add_argument("-o", "--output", help="Write all samples to this CSV")
+    args = parser.parse_args()
+
+    jobs = load_corpus(args.corpus) if args.corpus else [(d, n) for d, n, _ in generate_corpus(200)]
+    configs = {
+        "long-lived": {},
+        "recycled": {"max_files": args.recycle_files, "max_rss_mb": args.recycle_mb},
+    }
+    results = {label: run_config(label, jobs, args.files, args.workers, args.interval, **limits)
+               for label, limits in configs.items()}
+
+    if args.output:
+        with open(args.output, "w", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["config", "seconds", "files", "rss_mb"])
+            for label, samples in results.items():
+                writer.writerows((label, f"{s:.2f}", n, f"{r:.1f}") for s, n, r in samples)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Per-file tasks vs adaptive micro-batches for archives of tiny PDFs.
+
+Usage:
+    python -m benchmarks.microbatch [--count 2000] [--workers 4] [--backend process]
+"""
+import argparse
+import os
+import time
+
+from benchmarks.corpus import make_paper
+from src.core.jobs import entry_point
+from src.core.pool import BACKENDS, create_executor
+from src.core.scheduler import MicroBatcher, run_windowed
+
+def run(executor, jobs, batcher, in_flight):
+    submit = lambda source, name: executor.submit(entry_point(source), source, name, True, None)
+    start = time.perf_counter()
+    files = rows = 0
+    for _, future in run_windowed(submit, jobs, in_flight, batcher=batcher):
+        rows += len(future.result()[0])
+        files += 1
+    return files / (time.perf_counter() - start), rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--backend", choices=BACKENDS, default="process")
+    args = parser.parse_args()
+
+    # 1-2 page papers, the shape of the archives that motivated batching
+    tiny = [make_paper(seed=s, pages=1 + s % 2, emails=1) for s in range(50)]
+    jobs = [(tiny[i % len(tiny)], f"tiny_{i:05d}.pdf") for i in range(args.count)]
+    print(f"{len(jobs)} PDFs, mean {sum(len(d) for d, _ in jobs) / len(jobs) / 1024:.0f} KB, "
+          f"{args.backend} x {args.workers}")
+
+    with create_executor(args.backend, args.workers) as executor:
+        run(executor, jobs[:50], None, args.workers * 4)  # warm-up
+        for label, batcher in (("per-file tasks", None), ("micro-batches", MicroBatcher())):
+            rate, rows = run(executor, jobs, batcher, args.workers * 4)
+            print(f"  {label:>15}: {rate:8.1f} files/sec ({rows} rows)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Memory per result row: dict rows vs ResultRow records.
+
+Builds the rows of a large run the way the parent process receives them
+(one pickled result per file, unpickled and appended to one list) and
+reports the traced memory per row and the pickled bytes per file, once for
+the old dict rows and once for ResultRow. No PDFs are parsed.
+
+Usage:
+    python -m benchmarks.records [--rows 1000000] [--unknown-title 0.2]
+"""
+import argparse
+import gc
+import pickle
+import random
+import time
+import tracemalloc
+
+from benchmarks.corpus import WORDS
+from src.core.records import ResultRow
+
+def synthetic_files(rows, unknown_title, seed=0):
+    """(file name, title, emails) per file until `rows` rows, 1-5 emails each."""
+    rng = random.Random(seed)
+    files = []
+    total = 0
+    while total < rows:
+        n = min(rng.randint(1, 5), rows - total)
+        title = "Unknown Title" if rng.random() < unknown_title else " ".join(rng.choices(WORDS, k=10)).title()
+        emails = [f"{rng.choice(WORDS)}.{total + i}@univ{rng.randint(1, 9)}.edu" for i in range(n)]
+        files.append((f"papers/batch_{len(files) // 1000:04d}/paper_{len(files):07d}.pdf", title, emails))
+        total += n
+    return files
+
+def as_dicts(file_name, title, emails):
+    return [{"File Name": file_name, "Exact Title": title, "Email": email} for email in emails]
+
+def as_records(file_name, title, emails):
+    return [ResultRow(file_name, title, email) for email in emails]
+
+def run_mode(files, make):
+    """Traced bytes held by the accumulated rows, pickled bytes and seconds."""
+    payloads = [pickle.dumps(make(*f)) for f in files]
+    pickled = sum(len(p) for p in payloads)
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = []
+    for payload in payloads:
+        results.extend(pickle.loads(payload))
+    elapsed = time.perf_counter() - start
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(results), held, peak, pickled, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--unknown-title", type=float, default=0.2, help="Share of files without a title")
+    args = parser.parse_args()
+
+    files = synthetic_files(args.rows, args.unknown_title)
+    print(f"{args.rows} rows from {len(files)} files")
+    for label, make in (("dict rows", as_dicts), ("ResultRow", as_records)):
+        rows, held, peak, pickled, elapsed = run_mode(files, make)
+        print(
+            f"  {label:<10}: {held / rows:7.1f} B/row held  {peak / 1024 / 1024:8.1f} MB peak"
+            f"  {pickled / len(files):7.1f} B/file pickled  {elapsed:6.2f}s to receive"
+        )
+
+if __name__ == "__main__":
+    main()
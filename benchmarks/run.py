@@ -0,0 +1,149 @@
+"""
+Extractor benchmark: files/sec, per-file latency percentiles and peak RSS.
+
+Usage:
+    python -m benchmarks.run [--count 200] [--seed 0] [-o before.json]
+    python -m benchmarks.run --corpus papers/ --workers 8 --backend process
+    python -m benchmarks.run --compare before.json after.json
+"""
+import argparse
+import concurrent.futures
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.corpus import generate_corpus, load_corpus
+from src.core.extractor import process_single_pdf
+from src.core.pool import BACKENDS, create_executor
+from src.core.preflight import PdfError
+from src.core.timing import BatchTimings, StageTimer
+
+def timed_extract(data, name, exclude_no_email=True):
+    """Worker-side wrapper: returns (seconds, rows, stage timings) for one file; a failed file has no rows."""
+    timer = StageTimer()
+    start = time.perf_counter()
+    try:
+        rows = process_single_pdf(data, name, exclude_no_email, timer)
+    except PdfError:
+        rows = []
+    return time.perf_counter() - start, rows, timer.stages
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, round(pct / 100 * len(values)) - 1))
+    return values[rank]
+
+def peak_rss_mb():
+    """Peak RSS of this process and of its largest exited worker (Linux reports kB)."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(own / scale, 1), round(children / scale, 1)
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+def run_benchmark(jobs, workers=0, backend="process", extract=timed_extract):
+    """
+    Runs every (data, name) job once. workers=0 runs in-process, which gives
+    the cleanest latency numbers; otherwise jobs go through create_executor.
+    """
+    latencies = []
+    rows = 0
+    timings = BatchTimings()
+    start = time.perf_counter()
+    if workers:
+        with create_executor(backend, workers) as executor:
+            futures = [executor.submit(extract, data, name) for data, name in jobs]
+            for future in concurrent.futures.as_completed(futures):
+                seconds, res, stages = future.result()
+                latencies.append(seconds)
+                timings.add(stages)
+                rows += len(res)
+    else:
+        for data, name in jobs:
+            seconds, res, stages = extract(data, name)
+            latencies.append(seconds)
+            timings.add(stages)
+            rows += len(res)
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    rss_self, rss_children = peak_rss_mb()
+    return {
+        "files": len(jobs),
+        "rows": rows,
+        "megabytes": round(sum(len(d) for d, _ in jobs) / 1e6, 2),
+        "wall_seconds": round(wall, 3),
+        "files_per_sec": round(len(jobs) / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        },
+        "peak_rss_mb": {"self": rss_self, "children": rss_children},
+        "stages": timings.summary(),
+    }
+
+def compare(before_path, after_path):
+    with open(before_path) as fh:
+        before = json.load(fh)
+    with open(after_path) as fh:
+        after = json.load(fh)
+
+    def line(label, old, new, higher_is_better):
+        change = (new - old) / old * 100 if old else 0.0
+        better = (change > 0) == higher_is_better and change != 0
+        print(f"{label:>16}: {old:10.2f} -> {new:10.2f}  ({change:+.1f}%{' better' if better else ''})")
+
+    b, a = before["result"], after["result"]
+    line("files/sec", b["files_per_sec"], a["files_per_sec"], True)
+    for key in ("p50", "p95", "p99"):
+        line(f"{key} ms", b["latency_ms"][key], a["latency_ms"][key], False)
+    line("peak RSS MB", b["peak_rss_mb"]["self"], a["peak_rss_mb"]["self"], False)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200, help="Synthetic papers to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", help="Use PDFs from a directory or ZIP instead of the synthetic corpus")
+    parser.add_argument("--workers", type=int, default=0, help="0 = run in-process (best for latency)")
+    parser.add_argument("--backend", choices=BACKENDS, default="process")
+    parser.add_argument("-o", "--output", help="Save the run as JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two saved runs")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    if args.corpus:
+        jobs = load_corpus(args.corpus)
+    else:
+        jobs = [(data, name) for data, name, _ in generate_corpus(args.count, args.seed)]
+
+    result = run_benchmark(jobs, args.workers, args.backend)
+    report = {
+        "revision": _git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "settings": {"count": args.count, "seed": args.seed, "corpus": args.corpus,
+                     "workers": args.workers, "backend": args.backend},
+        "result": result,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+if __name__ == "__main__":
+    main()
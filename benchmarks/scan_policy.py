@@ -0,0 +1,40 @@
+"""
+Email recall vs cost of page-scan policies.
+
+Compares the old fixed "first 6 pages" scan, the default ScanPolicy (head,
+tail and keyword follow-ups) and reading every page. Recall is measured
+against the addresses the synthetic corpus printed, so a corpus path is not
+accepted here.
+
+Usage:
+    python -m benchmarks.scan_policy [--count 300] [--repeat 3]
+"""
+import fitz
+
+from benchmarks.common import best_of, corpus_parser
+from benchmarks.corpus import generate_corpus
+from src.core.extractor import SCAN_POLICY, ScanPolicy, extract_from_doc
+
+POLICIES = {
+    "first 6 pages": ScanPolicy(head=6, tail=0, follow=0, max_page_chars=10**9),
+    "head+tail+follow": SCAN_POLICY,
+    "every page": ScanPolicy(head=10**6, tail=0, follow=0, max_page_chars=10**9, enough_emails=10**6),
+}
+
+def expected_emails(features):
+    if features["email_position"] == "none" or features["image_only_pages"]:
+        return 0
+    return features["emails"]
+
+def main():
+    args = corpus_parser(__doc__, corpus=False, count_help="Synthetic papers to generate").parse_args()
+    docs = [(fitz.open(stream=data, filetype="pdf"), expected_emails(f)) for data, _, f in generate_corpus(args.count)]
+    expected = sum(e for _, e in docs)
+    print(f"{len(docs)} papers, {expected} printed emails")
+    for label, policy in POLICIES.items():
+        seconds, found = best_of(lambda item: len(extract_from_doc(item[0], True, policy=policy)), docs, args.repeat)
+        recalled = sum(min(n, e) for n, (_, e) in zip(found, docs))
+        print(f"  {label:>17}: {seconds / len(docs) * 1000:7.3f} ms/file  recall {recalled}/{expected} ({recalled / expected:.1%})")
+
+if __name__ == "__main__":
+    main()
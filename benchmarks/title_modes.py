@@ -0,0 +1,30 @@
+"""
+Fast (region-restricted) vs full-page visual title detection.
+
+Only files whose metadata title is unusable are timed, since the others never
+reach the visual heuristic.
+
+Usage:
+    python -m benchmarks.title_modes [corpus dir or .zip] [--count 300] [--repeat 3]
+"""
+from benchmarks.common import best_of, corpus_parser, load_jobs, open_docs
+from src.core.extractor import _get_title_from_doc
+
+def main():
+    args = corpus_parser(__doc__).parse_args()
+    docs = open_docs(load_jobs(args))
+    docs = [d for d in docs if d.page_count and _get_title_from_doc(d, metadata_only=True) == "Unknown Title"]
+    if not docs:
+        raise SystemExit("No files reach the visual title fallback")
+
+    full_s, full_titles = best_of(lambda doc: _get_title_from_doc(doc, fast=False), docs, args.repeat)
+    fast_s, fast_titles = best_of(lambda doc: _get_title_from_doc(doc, fast=True), docs, args.repeat)
+    same = sum(a == b for a, b in zip(full_titles, fast_titles))
+
+    print(f"Files reaching the visual fallback: {len(docs)}")
+    print(f"  full page: {full_s / len(docs) * 1000:8.3f} ms/file")
+    print(f"  fast clip: {fast_s / len(docs) * 1000:8.3f} ms/file  ({full_s / fast_s:.1f}x faster)")
+    print(f"  same title as full page: {same}/{len(docs)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Pickled bytes vs shared memory for sending PDFs to worker processes.
+
+Each job hands one buffer to a process-pool worker, which only touches the
+bytes (CRC-32) so the transfer dominates. Reports the per-job round trip for
+100 KB, 5 MB and 50 MB inputs. Pickling copies every buffer into the pipe and
+again out of it; shared memory copies it once into the segment.
+
+Usage:
+    python -m benchmarks.transport [--jobs 40] [--workers 4]
+"""
+import argparse
+import concurrent.futures
+import os
+import time
+import zlib
+
+from src.core.jobs import load_source
+from src.core.pool import create_executor
+from src.core.transport import shared_submit
+
+SIZES = {"100 KB": 100 * 1024, "5 MB": 5 * 1024 * 1024, "50 MB": 50 * 1024 * 1024}
+
+def touch(source, name):
+    """Worker: attach/unpickle the source and read every byte once."""
+    with load_source(source) as data:
+        return zlib.crc32(data)
+
+def run(executor, data, jobs, use_shm):
+    submit = lambda source, name: executor.submit(touch, source, name)
+    if use_shm:
+        submit = shared_submit(submit, min_size=0)
+    start = time.perf_counter()
+    futures = [submit(data, f"job_{i}") for i in range(jobs)]
+    for future in concurrent.futures.as_completed(futures):
+        future.result()
+    return (time.perf_counter() - start) / jobs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with create_executor("process", args.workers) as executor:
+        executor.submit(touch, b"warm-up", "").result()
+        for label, size in SIZES.items():
+            data = os.urandom(size)
+            jobs = args.jobs if size < SIZES["50 MB"] else max(4, args.jobs // 5)
+            for use_shm in (False, True):
+                per_job = run(executor, data, jobs, use_shm)
+                transport = "shared memory" if use_shm else "pickled bytes"
+                print(f"{label:>7} {transport:>14}: {per_job * 1000:8.2f} ms/job")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Scanned/image-only triage on vs off.
+
+Runs the full two-tier path per file (fitz, then the pdfplumber fallback for
+thin text layers) and reports how files were classified (text, mixed,
+image-only), the time per file with and without triage, and whether the
+rows of the text files match.
+
+Usage:
+    python -m benchmarks.triage [corpus dir or .zip] [--count 300] [--repeat 3]
+"""
+import contextlib
+
+from benchmarks.common import best_of, corpus_parser, load_jobs, open_docs
+from src.core.extractor import extract_from_doc, process_single_pdf_fallback
+from src.core.preflight import PdfError
+from src.core.timing import StageTimer
+
+def run_mode(jobs, docs, triage, repeat):
+    """Best-of-`repeat` seconds, the rows per document and the triage notes per document."""
+    def extract(item):
+        (data, name), doc = item
+        timer = StageTimer()
+        rows = extract_from_doc(doc, True, timer, triage=triage)
+        if "thin_text" in timer.notes:
+            # As in scheduler.tiered_submit, a file pdfplumber cannot parse keeps its fitz rows
+            with contextlib.suppress(PdfError):
+                rows = process_single_pdf_fallback(data, name, True, timer)
+        return rows, timer.notes
+
+    seconds, out = best_of(extract, list(zip(jobs, docs)), repeat)
+    return seconds, [rows for rows, _ in out], [notes for _, notes in out]
+
+def main():
+    args = corpus_parser(__doc__).parse_args()
+    jobs = load_jobs(args)
+    docs = open_docs(jobs)
+
+    off_s, off_rows, _ = run_mode(jobs, docs, False, args.repeat)
+    on_s, on_rows, notes = run_mode(jobs, docs, True, args.repeat)
+    image_only = sum("image_only" in n for n in notes)
+    mixed = sum("mixed" in n for n in notes)
+    text = [i for i, n in enumerate(notes) if "image_only" not in n]
+    same = sum(
+        [(r["Exact Title"], r["Email"]) for r in off_rows[i]] == [(r["Exact Title"], r["Email"]) for r in on_rows[i]]
+        for i in text
+    )
+
+    print(f"{len(docs)} files: {len(docs) - image_only - mixed} text, {mixed} mixed, {image_only} image-only (need OCR)")
+    print(f"  no triage : {off_s / len(docs) * 1000:8.3f} ms/file")
+    print(f"  triage    : {on_s / len(docs) * 1000:8.3f} ms/file  ({off_s / on_s:.2f}x)")
+    print(f"  text and mixed files with identical rows: {same}/{len(text)}")
+
+if __name__ == "__main__":
+    main()
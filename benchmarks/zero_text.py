@@ -0,0 +1,43 @@
+"""
+Zero-text fast path (mailto links + Info/XMP metadata) on vs off.
+
+Reports how many files are resolved without reading any page text, the
+time per file with and without the fast path, and the addresses it loses:
+a file resolved from its mailto: links never reads the page text, so an
+address printed without a link is missed (the corpus links only some
+addresses of a share of its papers).
+
+Usage:
+    python -m benchmarks.zero_text [corpus dir or .zip] [--count 300] [--repeat 3]
+"""
+from benchmarks.common import best_of, corpus_parser, load_jobs, open_docs
+from src.core.extractor import extract_from_doc
+from src.core.timing import StageTimer
+
+def run_mode(docs, zero_text, repeat):
+    """Best-of-`repeat` seconds, the rows per document and the files resolved without page text."""
+    def extract(doc):
+        timer = StageTimer()
+        return extract_from_doc(doc, True, timer, zero_text=zero_text), "zero_text" in timer.notes
+
+    seconds, out = best_of(extract, docs, repeat)
+    return seconds, [rows for rows, _ in out], sum(resolved for _, resolved in out)
+
+def main():
+    args = corpus_parser(__doc__).parse_args()
+    docs = open_docs(load_jobs(args))
+
+    off_s, off_rows, _ = run_mode(docs, False, args.repeat)
+    on_s, on_rows, resolved = run_mode(docs, True, args.repeat)
+    expected = [{r["Email"] for r in rows} for rows in off_rows]
+    missed = [len(want - {r["Email"] for r in rows}) for want, rows in zip(expected, on_rows)]
+    total = sum(map(len, expected))
+
+    print(f"{len(docs)} files, {resolved} ({resolved / len(docs):.1%}) resolved without page text")
+    print(f"  text only : {off_s / len(docs) * 1000:8.3f} ms/file")
+    print(f"  zero-text : {on_s / len(docs) * 1000:8.3f} ms/file  ({off_s / on_s:.2f}x)")
+    print(f"  every text-path email also found: {missed.count(0)}/{len(docs)} files")
+    print(f"  text-path emails missed: {sum(missed)}/{total} (recall {1 - sum(missed) / max(total, 1):.2%})")
+
+if __name__ == "__main__":
+    main()
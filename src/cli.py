@@ -0,0 +1,158 @@
+"""
+Headless batch extraction of titles and emails.
+
+Usage:
+    python -m src.cli papers/ archive.zip -o results.csv
+    python -m src.cli papers/ -o results.jsonl --workers 16
+"""
+import argparse
+import collections
+import contextlib
+import csv
+import json
+import os
+import sys
+import time
+
+from src.core.pool import BACKENDS, create_executor
+from src.core.records import ERROR_FIELDS, FIELDS, OCR_FIELDS, ErrorRecord
+from src.core.scheduler import MicroBatcher, build_submit, result_of, run_windowed
+from src.core.timing import BatchTimings
+from src.utils.file_handler import iter_pdf_paths
+
+class RowWriter:
+    """
+    Streams ResultRow or ErrorRecord tuples to CSV or JSONL, flushing after
+    every file so partial runs are usable.
+    """
+
+    def __init__(self, stream, fmt, fields=FIELDS):
+        self.stream = stream
+        self.fmt = fmt
+        self.fields = fields
+        if fmt == "csv":
+            self._csv = csv.writer(stream)
+            self._csv.writerow(fields)
+
+    def write(self, records):
+        self.write_tuples(record.as_tuple() for record in records)
+
+    def write_tuples(self, rows):
+        for row in rows:
+            if self.fmt == "csv":
+                self._csv.writerow(row)
+            else:
+                self.stream.write(json.dumps(dict(zip(self.fields, row)), ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories and/or ZIP archives")
+    parser.add_argument("-o", "--output", default="-", help="Output .csv or .jsonl file (default: CSV on stdout)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Output format (default: from the file extension)")
+    parser.add_argument("--backend", choices=BACKENDS, default="process")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--in-flight", type=int, default=0, help="Files in flight (default: 4 x workers)")
+    parser.add_argument("--max-mb-in-flight", type=int, default=512, help="PDF megabytes held in memory at once")
+    parser.add_argument("--include-no-email", action="store_true", help="Also emit files without any email")
+    parser.add_argument("--errors", metavar="PATH", help="Also write failed files (name, error code, detail) to this .csv or .jsonl file")
+    parser.add_argument("--needs-ocr", metavar="PATH", help="Also write image-only files (no text layer) to this .csv or .jsonl file")
+    parser.add_argument("--timeout", type=float, default=120, metavar="SECONDS",
+                        help="Kill and replace a worker stuck on one file this long (process backend, 0 = no limit)")
+    parser.add_argument("--recycle-files", type=int, default=2000, metavar="N",
+                        help="Replace process workers after this many files each (0 = never)")
+    parser.add_argument("--recycle-mb", type=int, default=1024, metavar="MB",
+                        help="Replace process workers whose RSS grows past this (0 = never)")
+    parser.add_argument("--fallback-workers", type=int, default=1, metavar="N",
+                        help="Workers re-reading near-textless files with pdfplumber (0 = no fallback)")
+    parser.add_argument("--no-batching", action="store_true", help="Submit every file as its own task")
+    parser.add_argument("--cache", metavar="PATH", help="Reuse/store results in this SQLite cache file")
+    parser.add_argument("--timings", action="store_true", help="Print a per-stage time breakdown at the end")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    fmt = args.format or ("jsonl" if args.output.endswith(".jsonl") else "csv")
+    exclude_no_email = not args.include_no_email
+    cache_path = os.path.abspath(args.cache) if args.cache else None
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    writer = RowWriter(out, fmt)
+    errors_out = open(args.errors, "w", newline="", encoding="utf-8") if args.errors else None
+    error_writer = errors_out and RowWriter(errors_out, "jsonl" if args.errors.endswith(".jsonl") else "csv", ERROR_FIELDS)
+    ocr_out = open(args.needs_ocr, "w", newline="", encoding="utf-8") if args.needs_ocr else None
+    ocr_writer = ocr_out and RowWriter(ocr_out, "jsonl" if args.needs_ocr.endswith(".jsonl") else "csv", OCR_FIELDS)
+
+    files = rows = cache_hits = needs_ocr = 0
+    failed = collections.Counter()
+    timings = BatchTimings()
+
+    def report(error):
+        print(f"ERROR [{error.code}]: {error.file_name} -> {error.detail}", file=sys.stderr)
+        failed[error.code] += 1
+        if error_writer:
+            error_writer.write([error])
+
+    def unreadable(path, exc):
+        # A file or archive that cannot be read counts as one failed file; the walk goes on
+        nonlocal files
+        files += 1
+        report(ErrorRecord(path, "read_error", str(exc)))
+
+    start = time.perf_counter()
+    limits = (args.timeout or None, args.recycle_files or None, args.recycle_mb or None)
+    with contextlib.ExitStack() as stack:
+        executor = stack.enter_context(create_executor(args.backend, args.workers, *limits))
+        fallback = None
+        if args.fallback_workers > 0:
+            fallback = stack.enter_context(create_executor(args.backend, args.fallback_workers, *limits)).submit
+        submit = build_submit(executor.submit, fallback, exclude_no_email, cache_path, shared=args.backend == "process")
+
+        jobs = iter_pdf_paths(args.inputs, on_error=unreadable)
+        in_flight = args.in_flight or args.workers * 4
+        batcher = None if args.no_batching else MicroBatcher()
+        for file_name, future in run_windowed(submit, jobs, in_flight, args.max_mb_in_flight * 1024 * 1024, batcher=batcher):
+            res, meta = result_of(future, file_name)
+            timings.add(meta["stages"], meta["notes"])
+            cache_hits += meta["cache_hit"]
+            if meta["error"] is not None:
+                report(meta["error"])
+            if "image_only" in meta["notes"]:
+                # No text layer: listed apart so the file can be sent to OCR
+                needs_ocr += 1
+                if ocr_writer:
+                    ocr_writer.write_tuples([(file_name,)])
+            writer.write(res)
+            files += 1
+            rows += len(res)
+
+    duration = time.perf_counter() - start
+    if out is not sys.stdout:
+        out.close()
+    if errors_out:
+        errors_out.close()
+    if ocr_out:
+        ocr_out.close()
+
+    errors = sum(failed.values())
+    summary = f"Processed {files} files in {duration:.2f}s ({files / duration if duration else 0:.1f} files/sec), {rows} rows, {errors} errors"
+    if failed:
+        summary += " (" + ", ".join(f"{n} {code}" for code, n in failed.most_common()) + ")"
+    if needs_ocr:
+        summary += f", {needs_ocr} image-only files need OCR"
+    if args.cache:
+        summary += f", {cache_hits} cache hits"
+    print(summary, file=sys.stderr)
+    if args.timings:
+        for row in timings.summary():
+            print("  {Stage:>15}: {Total (s):9.3f}s  {Files:7d} files  {Mean (ms):9.3f} ms/file  {Share:>6}".format(**row), file=sys.stderr)
+        zero_text = timings.notes.get("zero_text", 0)
+        print(f"  {zero_text} of {files} files resolved from links/metadata without page text", file=sys.stderr)
+        for row in timings.tiers():
+            print("  {Tier:>15}: {Total (s):9.3f}s  {Files:7d} files  {Mean (ms):9.3f} ms/file".format(**row), file=sys.stderr)
+    return 1 if files and errors == files else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
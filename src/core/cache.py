@@ -0,0 +1,114 @@
+import collections
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from src.core.extractor import EXTRACTOR_VERSION
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "pdf2email", "results.sqlite")
+
+def cache_key(data, **settings):
+    """SHA-256 of the PDF bytes plus every setting that changes the output."""
+    digest = hashlib.sha256(data).hexdigest()
+    options = ",".join(f"{k}={settings[k]!r}" for k in sorted(settings))
+    return f"{digest}:v{EXTRACTOR_VERSION}:{options}"
+
+class ResultCache:
+    """
+    Two-tier cache of process_single_pdf rows keyed by cache_key().
+    - Memory: LRU of the most recent `memory_items` entries.
+    - Disk: SQLite file, trimmed to `max_disk_bytes` by evicting the least
+      recently used entries.
+    Rows are stored without "File Name" so the same PDF uploaded under a
+    different name is still a hit. Safe to share between threads; several
+    processes may share the same file (each keeps its own memory tier).
+    """
+
+    def __init__(self, path=DEFAULT_PATH, memory_items=10000, max_disk_bytes=512 * 1024 * 1024):
+        self.path = path
+        self.memory_items = memory_items
+        self.max_disk_bytes = max_disk_bytes
+
+        self._lock = threading.Lock()
+        self._memory = collections.OrderedDict()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, rows TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.commit()
+        self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def get(self, key, file_name):
+        """Returns the cached rows re-labelled with `file_name`, or None on a miss."""
+        with self._lock:
+            rows = self._memory.get(key)
+            if rows is not None:
+                self._memory.move_to_end(key)
+            else:
+                found = self._db.execute("SELECT rows FROM results WHERE key = ?", (key,)).fetchone()
+                if found is not None:
+                    rows = json.loads(found[0])
+                    self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    self._remember(key, rows)
+
+            if rows is None:
+                return None
+        return [{**row, "File Name": file_name} for row in rows]
+
+    def put(self, key, rows):
+        """Stores the rows of one file (failed files raise before reaching here)."""
+        rows = [{k: v for k, v in row.items() if k != "File Name"} for row in rows]
+        payload = json.dumps(rows)
+        with self._lock:
+            self._remember(key, rows)
+            old = self._db.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, rows, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time()),
+            )
+            self._disk_bytes += len(payload) - (old[0] if old else 0)
+            if self._disk_bytes > self.max_disk_bytes:
+                # Other processes write to the same file: recount before evicting
+                self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+                self._evict()
+            self._db.commit()
+
+    def _remember(self, key, rows):
+        self._memory[key] = rows
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        """Drops least recently used entries until the file is back under 90% of its budget."""
+        target = self.max_disk_bytes * 0.9
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY accessed").fetchall():
+            if self._disk_bytes <= target:
+                break
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            self._disk_bytes -= size
+
+_open_caches = {}
+_open_lock = threading.Lock()
+
+def open_cache(path):
+    """
+    Per-process ResultCache for `path`. Pool workers call this so every
+    thread in a process shares one LRU tier, and every process shares the
+    SQLite file.
+    """
+    with _open_lock:
+        cache = _open_caches.get(path)
+        if cache is None:
+            max_mb = int(os.environ.get("PDF2EMAIL_CACHE_MB", 512))
+            cache = _open_caches[path] = ResultCache(path, max_disk_bytes=max_mb * 1024 * 1024)
+        return cache
@@ -1,9 +1,81 @@
+import html
+import io
 import pdfplumber
 import fitz  # PyMuPDF
 import re
+import urllib.parse
+from src.core.preflight import ENCRYPTED, PdfError
+from src.core.timing import NULL_TIMER
 
 # Regex for Email
 EMAIL_RE = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+# Characters of EMAIL_RE's local part, walked back over from each '@'
+LOCAL_PART_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-")
+
+# Bump whenever extraction output changes, so cached results are not reused
+EXTRACTOR_VERSION = 7
+
+# Zero-text fast path: mailto links and Info/XMP metadata are read before any
+# page text. A file they resolve never reads its pages, so an address printed
+# without a link next to linked ones is lost (about 1% of the addresses of
+# the benchmark corpus, see benchmarks/zero_text.py); set False for full recall
+ZERO_TEXT = True
+XMP_TITLE_RE = re.compile(r"<dc:title>.*?<rdf:li[^>]*>(.*?)</rdf:li>", re.DOTALL)
+
+# Text-density check: fewer characters than this over all scanned pages, and
+# no email found, marks the text layer as thin; the file is then retried
+# with the pdfplumber tier
+MIN_TEXT_CHARS = 50
+
+# Scan triage: a page without fonts whose images cover this share of it is a
+# scan; files made only of such pages are noted "image_only" and not parsed
+TRIAGE = True
+SCAN_COVERAGE = 0.5
+
+# Lower-case words that announce a contact address ("Correspondence to:", "E-mail:")
+CONTACT_WORDS = ("correspond", "email", "e-mail")
+
+# Fast title mode: share of page 1 height searched, widened until a title is confident
+FAST_TITLE = True
+TITLE_CLIP_STEPS = (0.35, 0.6, 1.0)
+TITLE_MIN_SIZE_RATIO = 1.2
+# Text-only spans: image blocks are never decoded for the title search
+TITLE_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+class ScanPolicy:
+    """
+    Which pages extract_from_doc reads for emails, and how much of them:
+    - the first `head` pages, then the last `tail` ones (corresponding-author
+      notes often sit on the last page); a page is never read twice, so short
+      papers are simply read once;
+    - up to `follow` pages after a page whose contact keyword ("Correspondence",
+      "E-mail") is not followed by an address, as it may continue overleaf;
+    - at most `max_page_chars` characters per page (its start and end, where
+      headers and footnotes are) go through the regex.
+    Scanning stops once `enough_emails` distinct addresses have been found.
+    """
+    __slots__ = ("head", "tail", "follow", "max_page_chars", "enough_emails")
+
+    def __init__(self, head=4, tail=2, follow=1, max_page_chars=30000, enough_emails=2):
+        self.head = head
+        self.tail = tail
+        self.follow = follow
+        self.max_page_chars = max_page_chars
+        self.enough_emails = enough_emails
+
+    def pages(self, page_count):
+        """Page numbers to scan before any keyword follow-ups, in scan order."""
+        head = range(min(self.head, page_count))
+        tail = range(max(self.head, page_count - self.tail), page_count)
+        return [*head, *tail]
+
+    def cap(self, text):
+        if len(text) <= self.max_page_chars:
+            return text
+        half = self.max_page_chars // 2
+        return text[:half] + "\n" + text[-half:]
+
+SCAN_POLICY = ScanPolicy()
 
 def extract_text_content(path):
     """
@@ -21,117 +93,316 @@ def extract_text_content(path):
         pass
 
     # 2. Hard Fallback to pdfplumber ONLY if fitz yields almost nothing
-    if len(text.strip()) < 50:
+    if len(text.strip()) < MIN_TEXT_CHARS:
         try:
             with pdfplumber.open(path) as pdf:
-                for p in pdf.pages[:6]:
-                    t = p.extract_text()
-                    if t:
-                        text += t + "\n"
+                text += _plumber_text(pdf, range(min(6, len(pdf.pages))))
         except Exception:
             pass
 
     return text.strip()
 
-def extract_from_doc(doc, exclude_no_email=True):
+def _plumber_text(pdf, pages):
+    """Text of the given pages of an open pdfplumber PDF (pure Python, 20-50x slower than fitz)."""
+    text = ""
+    for pno in pages:
+        t = pdf.pages[pno].extract_text()
+        if t:
+            text += t + "\n"
+    return text
+
+def extract_from_doc(doc, exclude_no_email=True, timer=NULL_TIMER, policy=SCAN_POLICY, zero_text=ZERO_TEXT, triage=TRIAGE):
     """
     Hyper-optimized extraction. Stops as soon as data is found.
+    Pages are picked by a ScanPolicy (head, tail, keyword follow-ups).
+    Scanned pages are skipped; a file of scans only is noted "image_only"
+    and keeps just the addresses of its links and metadata.
+    Pass a StageTimer to get a per-stage time breakdown.
     """
-    # 1. Quick Metadata Title Attempt
-    title = _get_title_from_doc(doc, metadata_only=True)
+    # 1. Quick Metadata Title Attempt (Info dictionary, then XMP)
+    title = _get_title_from_doc(doc, metadata_only=True, timer=timer)
     
     unique_emails = []
-    text = ""
+    text_chars = 0
+    scanned = text_pages = 0
+    page_one = None  # (page, TextPage) of page 1, kept for the visual title
+    queue = policy.pages(doc.page_count)
+    seen = set(queue)
+
+    # 2. Zero-text fast path: mailto links and metadata need no text layout
+    if zero_text:
+        _add_emails(unique_emails, _zero_text_emails(doc, queue))
+        timer.mark("link_emails")
+        if title != "Unknown Title" and len(unique_emails) >= policy.enough_emails:
+            timer.note("zero_text")
+            return [{"Exact Title": title, "Email": email} for email in unique_emails]
     
-    # 2. Sequential Page Scanning with Early Exit
-    for p in doc[:6]:
-        p_text = p.get_text("text")
-        text += p_text + "\n"
+    # 3. Head/tail page scanning with early exit
+    for pno in queue:
+        p = doc[pno]
+        if triage:
+            # Fonts and image placements come from the page resources, without any text layout
+            is_scan = not p.get_fonts() and _is_scanned(p)
+            timer.mark("triage")
+            if is_scan:
+                scanned += 1
+                continue
+            text_pages += 1
+        if pno == 0 and title == "Unknown Title":
+            # Page 1 is laid out once: the email scan reads its text now and the
+            # visual title turns it into spans later, only if the file is kept
+            page_one = (p, p.get_textpage(flags=TITLE_TEXT_FLAGS))
+            p_text = page_one[1].extractText()
+        else:
+            p_text = p.get_text("text")
+        p_text = policy.cap(p_text)
+        text_chars += len(p_text.strip())
+        timer.mark("page_text")
         
         # Immediate Email Search
-        found_emails = EMAIL_RE.findall(p_text)
-        for e in found_emails:
-            e_lower = e.lower()
-            if e_lower not in unique_emails:
-                unique_emails.append(e_lower)
+        _add_emails(unique_emails, _find_emails(p_text))
+
+        # A contact keyword with no address after it: read the next page(s) too
+        lowered = p_text.lower()
+        keyword = max(lowered.rfind(word) for word in CONTACT_WORDS)
+        if keyword != -1 and not _find_emails(p_text[keyword:]):
+            for nxt in range(pno + 1, min(pno + 1 + policy.follow, doc.page_count)):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    queue.append(nxt)
+        timer.mark("email_regex")
         
-        # AGGRESSIVE EARLY EXIT: If we have a title (from metdaata) and 2+ emails, stop now
-        if title != "Unknown Title" and len(unique_emails) >= 2:
+        # EARLY EXIT: page 1 is always read first, so the title no longer depends on later pages
+        if len(unique_emails) >= policy.enough_emails:
             break
 
-    # 3. Final Visual Title Fallback if metadata failed
-    if title == "Unknown Title":
-        title = _get_title_from_doc(doc, metadata_only=False)
+    # Image-only: no text layer to retry or to take a visual title from
+    if scanned and not text_pages:
+        timer.note("image_only")
+        return [{"Exact Title": title, "Email": email} for email in unique_emails]
+    if scanned:
+        timer.note("mixed")
+
+    # Text-density check: an (almost) empty text layer that gave no email is worth a pdfplumber retry
+    if text_chars < MIN_TEXT_CHARS and not unique_emails:
+        timer.note("thin_text")
 
+    # 4. Files without emails are dropped: never compute their title
     if not unique_emails and exclude_no_email:
         return []
 
+    # 5. Final Visual Title Fallback if metadata failed
+    if title == "Unknown Title":
+        blocks = page_one[1].extractDICT()["blocks"] if page_one else None
+        title = _get_title_from_doc(doc, metadata_only=False, timer=timer, blocks=blocks)
+
     if not unique_emails:
         return [{"Exact Title": title, "Email": "No Email Found"}]
 
     return [{"Exact Title": title, "Email": email} for email in unique_emails]
 
-def _get_title_from_doc(doc, metadata_only=False):
-    """Internal helper to extract title from a fitz Document."""
+def _find_emails(text):
+    """
+    Same matches as EMAIL_RE.findall(text), anchored on '@': str.find jumps
+    from one '@' to the next and the regex only runs from the start of each
+    local part, instead of being tried at every character of a dense page.
+    """
+    found = []
+    end = 0
+    at = text.find("@")
+    while at != -1:
+        start = at
+        while start > end and text[start - 1] in LOCAL_PART_CHARS:
+            start -= 1
+        match = EMAIL_RE.match(text, start)
+        if match:
+            found.append(match.group())
+            end = match.end()
+            at = text.find("@", end)
+        else:
+            at = text.find("@", at + 1)
+    return found
+
+def _add_emails(unique_emails, found):
+    """Appends lower-cased addresses not seen yet, keeping first-seen order."""
+    for e in found:
+        e_lower = e.lower()
+        if e_lower not in unique_emails:
+            unique_emails.append(e_lower)
+
+def _zero_text_emails(doc, pages):
+    """
+    Addresses readable without laying out any text: mailto: link targets on
+    `pages` and anything email-shaped in the Info and XMP metadata.
+    """
+    found = []
+    for pno in pages:
+        for link in doc[pno].get_links():
+            uri = link.get("uri") or ""
+            if uri[:7].lower() == "mailto:":
+                found += EMAIL_RE.findall(urllib.parse.unquote(uri[7:].partition("?")[0]))
+    meta = doc.metadata or {}
+    found += EMAIL_RE.findall(" ".join(meta.get(key) or "" for key in ("author", "subject", "keywords")))
+    found += EMAIL_RE.findall(doc.get_xml_metadata() or "")
+    return found
+
+def _is_scanned(page):
+    """True if the page's images cover at least SCAN_COVERAGE of it."""
+    if not page.get_images():
+        return False
+    covered = sum(abs(fitz.Rect(info["bbox"]) & page.rect) for info in page.get_image_info())
+    return covered >= SCAN_COVERAGE * abs(page.rect)
+
+def _usable_title(text):
+    """Metadata titles are often junk: file names, tool names, numbers."""
+    if not (5 < len(text) < 200) or re.match(r"^[\d\s\.\-_]+$", text):
+        return False
+    junk_patterns = [r"^microsoft word", r"^untitled", r"^latex", r"^presentation", r"\.pdf$", r"\.docx?$", r"^slide"]
+    return not any(re.search(pat, text, re.IGNORECASE) for pat in junk_patterns)
+
+def _get_title_from_doc(doc, metadata_only=False, timer=NULL_TIMER, fast=FAST_TITLE, blocks=None):
+    """
+    Internal helper to extract title from a fitz Document.
+    fast=True searches only the top of page 1 (no image blocks) and widens
+    the region step by step until a confident title is found. Page-1 "dict"
+    blocks from the email scan's layout can be passed in to skip a second one.
+    """
+    timer.lap()
     try:
-        # Strategy A: Metadata (Instant)
+        # Strategy A: Metadata (Instant), Info dictionary first, then XMP dc:title
         meta_title = doc.metadata.get("title", "").strip()
-        if meta_title and 5 < len(meta_title) < 200:
-            if not re.match(r"^[\d\s\.\-_]+$", meta_title):
-                junk_patterns = [r"^microsoft word", r"^untitled", r"^latex", r"^presentation", r"\.pdf$", r"\.docx?$", r"^slide"]
-                if not any(re.search(pat, meta_title, re.IGNORECASE) for pat in junk_patterns):
-                    return meta_title
+        if not _usable_title(meta_title):
+            match = XMP_TITLE_RE.search(doc.get_xml_metadata() or "")
+            meta_title = re.sub(r"\s+", " ", html.unescape(match.group(1))).strip() if match else ""
+        if _usable_title(meta_title):
+            timer.mark("metadata_title")
+            return meta_title
         
+        timer.mark("metadata_title")
         if metadata_only: return "Unknown Title"
 
         # Strategy B: Visual check (Page 1)
         page = doc[0]
-        blocks = page.get_text("dict")["blocks"]
-        candidates = []
-        for b in blocks:
-            if "lines" not in b: continue
-            for l in b["lines"]:
-                for s in l["spans"]:
-                    text = s["text"].strip()
-                    if len(text) < 3 or re.match(r"^[\d\s\.\-_]+$", text): continue
-                    if re.search(r"^(doi|issn|http|www|vol\.|no\.)", text, re.IGNORECASE): continue
-                    candidates.append({"text": text, "size": s["size"], "y": s["bbox"][1], "height": s["bbox"][3] - s["bbox"][1]})
-
-        if not candidates: return "Unknown Title"
-        
-        candidates.sort(key=lambda x: x["size"], reverse=True)
-        max_size = candidates[0]["size"]
-        title_spans = [c for c in candidates if c["size"] > max_size * 0.98]
-        title_spans.sort(key=lambda x: x["y"])
-
-        final_parts = []
-        if title_spans:
-            final_parts.append(title_spans[0]["text"])
-            last_y, last_h = title_spans[0]["y"], title_spans[0]["height"]
-            for i in range(1, len(title_spans)):
-                curr = title_spans[i]
-                if (curr["y"] - (last_y + last_h)) > last_h * 1.5: break # Significant gap
-                if any(kw in curr["text"].lower() for kw in ["university", "@", "email", "received"]): break
-                final_parts.append(curr["text"])
-                last_y, last_h = curr["y"], curr["height"]
-
-        return re.sub(r"\s+", " ", " ".join(final_parts)).strip() or "Unknown Title"
+        if not fast:
+            title, _ = _visual_title(page.get_text("dict")["blocks"])
+        else:
+            # Region-restricted: top of the page first, widen only if unsure
+            rect = page.rect
+            for fraction in TITLE_CLIP_STEPS:
+                clip = fitz.Rect(rect.x0, rect.y0, rect.x1, rect.y0 + rect.height * fraction)
+                if blocks is None:
+                    region = page.get_text("dict", clip=clip, flags=TITLE_TEXT_FLAGS)["blocks"]
+                else:
+                    region = blocks
+                title, confident = _visual_title(region, clip)
+                if confident: break
+
+        timer.mark("visual_title")
+        return title
     except Exception:
+        timer.mark("visual_title")
         return "Unknown Title"
 
-def process_single_pdf(file_content, file_name, exclude_no_email=True):
+def _visual_title(blocks, clip=None):
+    """
+    Largest-font heuristic over the "dict" blocks of page 1, limited to the
+    spans inside `clip` if given. Returns (title, confident). Confident means
+    the title font clearly stands out from the rest of the region and the
+    title does not run into the clip edge.
+    """
+    candidates = []
+    for b in blocks:
+        if "lines" not in b: continue
+        if clip is not None and b["bbox"][1] > clip.y1: continue
+        for l in b["lines"]:
+            for s in l["spans"]:
+                if clip is not None and s["bbox"][3] > clip.y1: continue
+                text = s["text"].strip()
+                if len(text) < 3 or re.match(r"^[\d\s\.\-_]+$", text): continue
+                if re.search(r"^(doi|issn|http|www|vol\.|no\.)", text, re.IGNORECASE): continue
+                candidates.append({"text": text, "size": s["size"], "y": s["bbox"][1], "height": s["bbox"][3] - s["bbox"][1]})
+
+    if not candidates:
+        return "Unknown Title", False
+    
+    candidates.sort(key=lambda x: x["size"], reverse=True)
+    max_size = candidates[0]["size"]
+    median_size = candidates[len(candidates) // 2]["size"]
+    title_spans = [c for c in candidates if c["size"] > max_size * 0.98]
+    title_spans.sort(key=lambda x: x["y"])
+
+    final_parts = []
+    if title_spans:
+        final_parts.append(title_spans[0]["text"])
+        last_y, last_h = title_spans[0]["y"], title_spans[0]["height"]
+        for i in range(1, len(title_spans)):
+            curr = title_spans[i]
+            if (curr["y"] - (last_y + last_h)) > last_h * 1.5: break # Significant gap
+            if any(kw in curr["text"].lower() for kw in ["university", "@", "email", "received"]): break
+            final_parts.append(curr["text"])
+            last_y, last_h = curr["y"], curr["height"]
+
+    title = re.sub(r"\s+", " ", " ".join(final_parts)).strip() or "Unknown Title"
+    confident = (
+        title != "Unknown Title"
+        and len(title) >= 10
+        and max_size >= median_size * TITLE_MIN_SIZE_RATIO
+        and (clip is None or last_y + 2 * last_h < clip.y1)
+    )
+    return title, confident
+
+def process_single_pdf(file_content, file_name, exclude_no_email=True, timer=NULL_TIMER):
     """
     High-performance extraction from memory bytes.
     Avoids temporary files and redundant opening.
+    Raises PdfError for an encrypted or unparsable file.
     """
     try:
+        timer.lap()
         doc = fitz.open(stream=file_content, filetype="pdf")
-        results = extract_from_doc(doc, exclude_no_email)
+        timer.mark("open")
+        if doc.needs_pass:
+            doc.close()
+            timer.note(ENCRYPTED)
+            raise PdfError(ENCRYPTED)
+        results = extract_from_doc(doc, exclude_no_email, timer)
         doc.close()
+        timer.mark("close")
         
         # Add filename to results
         for r in results:
             r["File Name"] = file_name
         return results
+    except PdfError:
+        raise
+    except Exception as e:
+        timer.note("parse_error")
+        raise PdfError("parse_error", str(e)) from e
+
+def process_single_pdf_fallback(file_content, file_name, exclude_no_email=True, timer=NULL_TIMER, policy=SCAN_POLICY):
+    """
+    Slow tier for PDFs whose text layer fitz found (almost) empty: pdfplumber
+    reads the pages the ScanPolicy picks, and the title still comes from fitz.
+    Raises PdfError for an unparsable file.
+    """
+    try:
+        timer.lap()
+        with pdfplumber.open(io.BytesIO(file_content)) as pdf:
+            text = _plumber_text(pdf, policy.pages(len(pdf.pages)))
+        timer.mark("fallback_text")
+        timer.note("pdfplumber")
+
+        unique_emails = []
+        _add_emails(unique_emails, _find_emails(text))
+        timer.mark("fallback_regex")
+        if not unique_emails and exclude_no_email:
+            return []
+
+        doc = fitz.open(stream=file_content, filetype="pdf")
+        title = _get_title_from_doc(doc, timer=timer)
+        doc.close()
+        emails = unique_emails or ["No Email Found"]
+        return [{"File Name": file_name, "Exact Title": title, "Email": email} for email in emails]
     except Exception as e:
-        return [{"File Name": file_name, "Exact Title": "Error", "Email": str(e)}]
+        timer.note("parse_error")
+        raise PdfError("parse_error", str(e)) from e
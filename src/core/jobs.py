@@ -0,0 +1,142 @@
+import contextlib
+
+from src.core.cache import cache_key, open_cache
+from src.core.extractor import process_single_pdf, process_single_pdf_fallback
+from src.core.pool import heartbeat
+from src.core.preflight import ERRORS, REJECTED, TRUNCATED, PdfError, preflight
+from src.core.records import ErrorRecord, to_records
+from src.core.timing import StageTimer
+from src.core.transport import SharedPdf, open_shared
+from src.utils.file_handler import ZipMember, read_zip_member
+
+class Batch:
+    """Several small (source, name) jobs sent to one worker as a single task."""
+    __slots__ = ("jobs", "size")
+
+    def __init__(self, jobs, size):
+        self.jobs = jobs
+        self.size = size
+
+def source_size(source):
+    """Bytes a job will hold in memory once loaded: PDF bytes, a shared PDF, an uncompressed ZIP member or a batch."""
+    if isinstance(source, (ZipMember, SharedPdf, Batch)):
+        return source.size
+    return memoryview(source).nbytes
+
+def entry_point(source):
+    """Pool function for a job source: run_batch for micro-batches, run_job otherwise."""
+    return run_batch if isinstance(source, Batch) else run_job
+
+@contextlib.contextmanager
+def load_source(source):
+    """
+    Yields a memoryview of the PDF bytes inside the worker: ZIP members are
+    inflated here and shared-memory PDFs are attached (and detached on exit).
+    fitz.open(stream=...) uses a memoryview in place, whereas a bytearray
+    would be copied to bytes first.
+    """
+    if isinstance(source, SharedPdf):
+        with open_shared(source) as view:
+            yield view
+    elif isinstance(source, ZipMember):
+        yield memoryview(read_zip_member(source))
+    else:
+        yield memoryview(source)
+
+def job_meta(timer=None, error=None):
+    """
+    The meta of a (records, meta) result: the stage timings and notes of
+    `timer` (none for a file that never ran), whether the rows came from
+    the cache and the file's ErrorRecord (None if it succeeded).
+    """
+    if timer is None:
+        return {"stages": {}, "notes": [], "cache_hit": False, "error": error}
+    return {"stages": timer.stages, "notes": timer.notes, "cache_hit": False, "error": error}
+
+def run_job(source, file_name, exclude_no_email=True, cache_path=None, fallback=False):
+    """
+    Pool entry point for one file: load, check the result cache, extract.
+    Returns (records, meta): a list of ResultRow and a job_meta() whose
+    notes include "image_only" for a scan that needs OCR. Cache hits never
+    reach fitz.open, and inputs the pre-flight rejects never reach the
+    cache. A file the pre-flight finds truncated is still handed to fitz,
+    which repairs most of them; it only gets the "truncated" code if that
+    fails. `fallback` tells whether a pdfplumber tier will retry thin-text
+    files.
+    """
+    timer = StageTimer()
+    meta = job_meta(timer)
+    try:
+        with load_source(source) as data:
+            timer.mark("read")
+            status = preflight(data)
+            timer.mark("preflight")
+            if status in REJECTED:
+                timer.note(status)
+                meta["error"] = ErrorRecord(file_name, status, ERRORS[status])
+                return [], meta
+            rows = _extract(data, file_name, exclude_no_email, cache_path, timer, meta, fallback=fallback)
+    except PdfError as e:
+        # A damaged tail fitz could not repair either
+        code = TRUNCATED if status == TRUNCATED and e.code == "parse_error" else e.code
+        meta["error"] = ErrorRecord(file_name, code, e.detail)
+        return [], meta
+    except Exception as e:
+        meta["error"] = ErrorRecord(file_name, "read_error", str(e))
+        return [], meta
+    return to_records(rows, file_name), meta
+
+def _extract(data, file_name, exclude_no_email, cache_path, timer, meta, extract=process_single_pdf, fallback=False):
+    settings = {"exclude_no_email": exclude_no_email}
+    if cache_path:
+        cache = open_cache(cache_path)
+        key = cache_key(data, **settings)
+        rows = cache.get(key, file_name)
+        timer.mark("cache")
+        if rows is not None:
+            meta["cache_hit"] = True
+            return rows
+
+    rows = extract(data, file_name, exclude_no_email, timer)
+    # A thin text layer is about to be retried by the pdfplumber tier, which caches the final rows.
+    # Image-only files are cheap to triage again, and their rows alone would lose the "image_only" note
+    if cache_path and not (fallback and "thin_text" in timer.notes) and "image_only" not in timer.notes:
+        cache.put(key, rows)
+        timer.mark("cache")
+    return rows
+
+def run_fallback(source, file_name, exclude_no_email=True, cache_path=None):
+    """
+    Pool entry point of the slow tier: pdfplumber extraction for a file whose
+    text layer fitz found too thin (see scheduler.tiered_submit). Same
+    (records, meta) contract and cache key as run_job.
+    """
+    timer = StageTimer()
+    meta = job_meta(timer)
+    try:
+        with load_source(source) as data:
+            timer.mark("read")
+            rows = _extract(data, file_name, exclude_no_email, cache_path, timer, meta, process_single_pdf_fallback)
+    except PdfError as e:
+        meta["error"] = ErrorRecord(file_name, e.code, e.detail)
+        return [], meta
+    except Exception as e:
+        meta["error"] = ErrorRecord(file_name, "read_error", str(e))
+        return [], meta
+    return to_records(rows, file_name), meta
+
+def run_batch(batch, label, exclude_no_email=True, cache_path=None, fallback=False):
+    """
+    Pool entry point for a micro-batch. Returns [(records, meta), ...] in
+    batch order; every file is isolated, so one failure only produces its own
+    ErrorRecord, and each file gets its own watchdog deadline.
+    """
+    results = []
+    for i, (source, file_name) in enumerate(batch.jobs):
+        if i:
+            heartbeat()  # the first file was announced when the job started
+        try:
+            results.append(run_job(source, file_name, exclude_no_email, cache_path, fallback))
+        except Exception as e:
+            results.append(([], job_meta(error=ErrorRecord(file_name, "parse_error", str(e)))))
+    return results
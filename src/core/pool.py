@@ -0,0 +1,455 @@
+import collections
+import concurrent.futures
+import contextlib
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import threading
+import time
+import weakref
+from concurrent.futures.process import BrokenProcessPool
+
+# Supported execution backends for process_single_pdf
+BACKENDS = ("thread", "process")
+
+# Process workers empty MuPDF's object store every this many files. Emptying
+# it after every file re-decodes shared fonts and costs ~60% throughput;
+# never emptying it lets it grow to MuPDF's 256 MB default per worker.
+STORE_TRIM_FILES = 200
+
+class JobTimeout(TimeoutError):
+    """A job ran past its deadline and the worker running it was killed."""
+
+# Worker-side state: the pipe to the watchdog, the running job, recycling limits
+_beats = None
+_current_job = None
+_limits = (None, None)
+_files = 0
+_trimmed_at = 0
+_recycling = False
+
+def _init_worker(beats=None, max_files=None, max_rss=None):
+    """
+    Process-pool initializer. Imports fitz and the extractor once per worker
+    so every job after the first only pays for the actual parsing.
+    """
+    global _beats, _limits
+    _beats = beats
+    _limits = (max_files, max_rss)
+    import fitz  # noqa: F401
+    import src.core.extractor  # noqa: F401
+
+def process_rss(pid="self"):
+    """Resident set size of a process in bytes, from /proc (0 where that is unavailable)."""
+    try:
+        with open(f"/proc/{pid}/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def heartbeat():
+    """
+    Marks the start of the next file of the current job, which restarts that
+    job's deadline. Only reported to the parent inside a WatchdogExecutor.
+    """
+    global _files
+    _files += 1
+    if _beats is not None and _current_job is not None:
+        # A few dozen bytes: one atomic pipe write, no feeder thread that
+        # would need the GIL while MuPDF is busy
+        _beats.send(("start", *_current_job, os.getpid()))
+
+def _watched(job_id, attempt, fn, args):
+    global _current_job
+    _current_job = (job_id, attempt)
+    heartbeat()
+    try:
+        return fn(*args)
+    finally:
+        _current_job = None
+        _after_job()
+
+def _after_job():
+    global _recycling, _trimmed_at
+    import fitz
+    # 1. Cap MuPDF's store (this PyMuPDF cannot read or set its size limit)
+    if _files - _trimmed_at >= STORE_TRIM_FILES:
+        fitz.TOOLS.store_shrink(100)
+        _trimmed_at = _files
+
+    # 2. Ask to be replaced once this worker has served enough files or grown too big
+    max_files, max_rss = _limits
+    if _recycling or _beats is None:
+        return
+    if (max_files and _files >= max_files) or (max_rss and process_rss() > max_rss):
+        _recycling = True
+        _beats.send(("recycle", os.getpid()))
+
+def _process_executor(max_workers, initargs=()):
+    # Spawn (not fork): the Streamlit server is multi-threaded
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=initargs,
+    )
+
+def create_executor(backend="thread", max_workers=64, timeout=None, max_files=None, max_rss_mb=None):
+    """
+    Builds the executor used to run process_single_pdf jobs.
+    - "thread": cheap to start, but span walking and regex work hold the GIL.
+    - "process": one interpreter per core, jobs are (bytes, name) pairs.
+    With a `timeout` (seconds per file) or a recycling limit (files served,
+    RSS in MB per worker), process pools get a watchdog (WatchdogExecutor).
+    Threads can be neither killed nor recycled, so these are ignored there.
+    """
+    if backend == "thread":
+        return concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+    if backend == "process":
+        # More processes than cores only adds context switching and RAM
+        workers = max(1, min(max_workers, os.cpu_count() or 1))
+        if timeout or max_files or max_rss_mb:
+            max_rss = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+            return WatchdogExecutor(workers, timeout, max_files, max_rss)
+        return _process_executor(workers)
+
+    raise ValueError(f"Unknown backend: {backend!r} (expected one of {BACKENDS})")
+
+class WatchdogExecutor(concurrent.futures.Executor):
+    """
+    Process pool with a hard per-file deadline and worker recycling.
+
+    Workers report over a pipe when they start a job (and, via heartbeat(),
+    each file of a batch). A watchdog thread SIGKILLs any worker that stays
+    on one file for more than `timeout` seconds: that job fails with
+    JobTimeout, a fresh process pool replaces the broken one, and the other
+    jobs caught in the broken pool are resubmitted. A worker that dies on
+    its own (a segfault, the OOM killer) breaks its pool the same way; only
+    the job that worker was running is charged a retry, at most
+    `max_retries` of them, so a file that keeps crashing its worker fails
+    on its own. Jobs that were queued or running on another worker of a
+    broken pool are retried without limit.
+
+    Long-lived workers creep in RSS (heap fragmentation, MuPDF caches), so a
+    worker that has served `max_files` files or grown past `max_rss` bytes
+    asks to be recycled. The pool is then retired gracefully, like
+    maxtasksperchild: new jobs go to a fresh pool while the old workers
+    finish what is already queued and exit.
+    """
+
+    def __init__(self, max_workers, timeout=None, max_files=None, max_rss=None, interval=0.25, max_retries=2):
+        self._max_workers = max_workers
+        self.timeout = timeout
+        self.max_files = max_files
+        self.max_rss = max_rss
+        self.interval = interval
+        self.max_retries = max_retries
+        self.timeouts = 0
+        self.recycles = 0
+        self.restarts = 0
+
+        self._beats, self._worker_beats = multiprocessing.get_context("spawn").Pipe(duplex=False)
+        self._lock = threading.RLock()
+        self._jobs = {}         # job id -> [future, fn, args, executor, attempt, crashes]
+        self._started = {}      # job id -> (pid, monotonic time of the last heartbeat)
+        self._expired = set()   # job ids whose worker the watchdog killed
+        self._pids = {}         # worker pid -> pool it belongs to
+        self._workers = weakref.WeakKeyDictionary()  # pool -> its {pid: Process}, kept past shutdown()
+        self._killed = weakref.WeakSet()  # pools the watchdog broke by killing a worker
+        self._ids = itertools.count(1)
+        self._closing = False
+        self._stopped = False
+        self._executor = self._new_pool()
+
+        self._watchdog = threading.Thread(target=self._watch, name="pdf-pool-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def submit(self, fn, *args):
+        future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel()
+        with self._lock:
+            if self._closing:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            job_id = next(self._ids)
+            self._jobs[job_id] = [future, fn, args, None, 0, 0]
+            self._start(job_id)
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        with self._lock:
+            self._closing = True
+        # A timeout during the wait swaps in a new pool; shut that one down too
+        while True:
+            with self._lock:
+                executor = self._executor
+            executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+            with self._lock:
+                if executor is self._executor or not wait:
+                    break
+        self._stopped = True
+        if wait:
+            self._watchdog.join()
+
+    def _start(self, job_id):
+        """(Re)submits a job to the current pool. Caller holds the lock."""
+        job = self._jobs[job_id]
+        try:
+            inner = self._executor.submit(_watched, job_id, job[4], job[1], job[2])
+        except BrokenProcessPool:
+            self._replace()
+            inner = self._executor.submit(_watched, job_id, job[4], job[1], job[2])
+        job[3] = self._executor
+        inner.add_done_callback(lambda f, job_id=job_id: self._settle(job_id, f))
+
+    def _new_pool(self):
+        executor = _process_executor(self._max_workers, (self._worker_beats, self.max_files, self.max_rss))
+        # shutdown() drops executor._processes, but the dict itself lives on and keeps filling
+        self._workers[executor] = executor._processes
+        return executor
+
+    def _died(self, executor, pid):
+        """
+        Whether worker `pid` of `executor` has exited. A broken pool fails its
+        jobs before it terminates the surviving workers, so when _settle()
+        runs only the worker that crashed is gone. Its sentinel (what the
+        pool itself watches) is ready before waitpid() reports the exit.
+        """
+        process = self._workers.get(executor, {}).get(pid)
+        return process is None or bool(multiprocessing.connection.wait([process.sentinel], 0))
+
+    def _replace(self):
+        """Swaps in a fresh process pool; the old one finishes its queue unless broken. Caller holds the lock."""
+        old = self._executor
+        self._executor = self._new_pool()
+        self._pids.clear()
+        self.restarts += 1
+        old.shutdown(wait=False)
+
+    def _settle(self, job_id, inner):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            future, _, _, executor, _, crashes = job
+            exc = concurrent.futures.CancelledError() if inner.cancelled() else inner.exception()
+            if isinstance(exc, BrokenProcessPool):
+                self._drain()  # a job that crashed right away may not have been read yet
+            started = self._started.pop(job_id, None)
+
+            if job_id in self._expired:
+                self._expired.discard(job_id)
+                exc = JobTimeout(f"No result after {self.timeout:g}s, worker restarted")
+            elif isinstance(exc, BrokenProcessPool) and not self._stopped:
+                # Only the job whose own worker died is charged; queued jobs and those on other
+                # workers (or beside a worker the watchdog killed) did nothing wrong
+                crashed = started is not None and executor not in self._killed and self._died(executor, started[0])
+                if not crashed or crashes < self.max_retries:
+                    if executor is self._executor:
+                        self._replace()
+                    job[4] += 1  # new attempt number, so late heartbeats of the old one are ignored
+                    job[5] += crashed
+                    self._start(job_id)
+                    return
+            del self._jobs[job_id]
+
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(inner.result())
+
+    def _drain(self):
+        """Handles the messages waiting in the workers' pipe. Caller holds the lock."""
+        while self._beats.poll(0):
+            kind, *msg = self._beats.recv()
+            if kind == "recycle":
+                # Only the current pool; an old one is already on its way out
+                if self._pids.get(msg[0]) is self._executor:
+                    self.recycles += 1
+                    self._replace()
+            else:
+                job_id, attempt, pid = msg
+                job = self._jobs.get(job_id)
+                if job is not None and job[4] == attempt:
+                    self._started[job_id] = (pid, time.monotonic())
+                    self._pids[pid] = job[3]
+
+    def _watch(self):
+        while not self._stopped:
+            # 1. Record job starts / heartbeats and recycling requests
+            if self._beats.poll(self.interval):
+                with self._lock:
+                    self._drain()
+
+            # 2. Kill workers stuck past the deadline
+            if not self.timeout:
+                continue
+            now = time.monotonic()
+            with self._lock:
+                expired = [(job_id, pid) for job_id, (pid, since) in self._started.items() if now - since > self.timeout]
+                if not expired:
+                    continue
+                # New pool first, so the resubmitted jobs have somewhere to go
+                if any(self._jobs[job_id][3] is self._executor for job_id, _ in expired):
+                    self._replace()
+                for job_id, pid in expired:
+                    self._killed.add(self._jobs[job_id][3])
+                    del self._started[job_id]
+                    self._expired.add(job_id)
+                    self.timeouts += 1
+                    with contextlib.suppress(ProcessLookupError):
+                        os.kill(pid, signal.SIGKILL)
+
+class SharedPool:
+    """
+    One long-lived executor shared by every Streamlit session on the server.
+
+    Each session submits into its own queue. A dispatcher thread feeds the
+    executor round-robin across sessions and never keeps more than
+    `max_in_flight` jobs inside it, so a session with 10,000 files cannot
+    starve one with 10. At most `max_sessions` sessions run at once; the
+    rest wait in session() until a slot frees up.
+
+    `fallback` is a separate small executor (`fallback_workers`, None if 0)
+    for the slow pdfplumber tier, so those files never hold the fast workers.
+    """
+
+    def __init__(self, backend="process", max_workers=None, max_in_flight=None, max_sessions=4, timeout=None,
+                 recycle_files=None, recycle_mb=None, fallback_workers=1):
+        max_workers = max_workers or os.cpu_count() or 1
+        self.backend = backend
+        self.timeout = timeout if backend == "process" else None
+        self.executor = create_executor(backend, max_workers, self.timeout, recycle_files, recycle_mb)
+        self.max_workers = self.executor._max_workers
+        # Slightly more than the worker count so workers never idle between jobs
+        self.max_in_flight = max_in_flight or self.max_workers * 2
+        self.max_sessions = max_sessions
+        self.fallback = None
+        if fallback_workers:
+            self.fallback = create_executor(backend, fallback_workers, self.timeout, recycle_files, recycle_mb)
+
+        self._slots = threading.BoundedSemaphore(max_sessions)
+        self._cond = threading.Condition()
+        self._queues = {}                   # session id -> deque of (future, fn, args)
+        self._order = collections.deque()   # round-robin order of session ids
+        self._ids = itertools.count(1)
+        self._in_flight = 0
+        self._waiting = 0
+
+        self._dispatcher = threading.Thread(target=self._dispatch, name="pdf-pool-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    @classmethod
+    def from_env(cls):
+        """Pool settings are server-wide, so they come from the environment rather than the UI."""
+        return cls(
+            backend=os.environ.get("PDF2EMAIL_BACKEND", "process"),
+            max_workers=int(os.environ.get("PDF2EMAIL_WORKERS", 0)) or None,
+            max_in_flight=int(os.environ.get("PDF2EMAIL_MAX_IN_FLIGHT", 0)) or None,
+            max_sessions=int(os.environ.get("PDF2EMAIL_MAX_SESSIONS", 4)),
+            timeout=float(os.environ.get("PDF2EMAIL_TIMEOUT", 120)) or None,
+            recycle_files=int(os.environ.get("PDF2EMAIL_RECYCLE_FILES", 2000)) or None,
+            recycle_mb=int(os.environ.get("PDF2EMAIL_RECYCLE_MB", 1024)) or None,
+            fallback_workers=int(os.environ.get("PDF2EMAIL_FALLBACK_WORKERS", 1)),
+        )
+
+    @property
+    def waiting_sessions(self):
+        """Number of sessions queued for a free slot."""
+        return self._waiting
+
+    @contextlib.contextmanager
+    def session(self, timeout=None):
+        """
+        Reserves a session slot (blocking while all are taken) and yields a
+        PoolSession. Jobs still queued when the block exits are cancelled.
+        """
+        with self._cond:
+            self._waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=timeout)
+        finally:
+            with self._cond:
+                self._waiting -= 1
+        if not acquired:
+            raise TimeoutError("No free extraction slot")
+
+        sid = next(self._ids)
+        with self._cond:
+            self._queues[sid] = collections.deque()
+            self._order.append(sid)
+        try:
+            yield PoolSession(self, sid)
+        finally:
+            with self._cond:
+                for future, _, _ in self._queues.pop(sid):
+                    future.cancel()
+                self._order.remove(sid)
+            self._slots.release()
+
+    def _submit(self, sid, fn, args):
+        future = concurrent.futures.Future()
+        with self._cond:
+            self._queues[sid].append((future, fn, args))
+            self._cond.notify_all()
+        return future
+
+    def _next_job(self):
+        """Pops the next job round-robin. Caller holds the lock."""
+        for _ in range(len(self._order)):
+            sid = self._order[0]
+            self._order.rotate(-1)
+            if self._queues[sid]:
+                return self._queues[sid].popleft()
+        return None
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                job = None
+                while job is None:
+                    if self._in_flight < self.max_in_flight:
+                        job = self._next_job()
+                    if job is None:
+                        self._cond.wait()
+                self._in_flight += 1
+
+            future, fn, args = job
+            if not future.set_running_or_notify_cancel():
+                self._release()
+                continue
+            try:
+                inner = self.executor.submit(fn, *args)
+            except Exception as exc:
+                future.set_exception(exc)
+                self._release()
+                continue
+            inner.add_done_callback(lambda f, outer=future: self._finish(outer, f))
+
+    def _release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _finish(self, outer, inner):
+        self._release()
+        if inner.cancelled():
+            outer.set_exception(concurrent.futures.CancelledError())
+            return
+        exc = inner.exception()
+        if exc is not None:
+            outer.set_exception(exc)
+        else:
+            outer.set_result(inner.result())
+
+class PoolSession:
+    """A single session's handle on the SharedPool. Mirrors executor.submit()."""
+
+    def __init__(self, pool, sid):
+        self.pool = pool
+        self.id = sid
+
+    def submit(self, fn, *args):
+        return self.pool._submit(self.id, fn, args)
@@ -0,0 +1,62 @@
+"""
+Header-only pre-flight checks. A PDF's first bytes and its tail (startxref
+and %%EOF) are enough to reject inputs that are not PDFs before fitz.open
+spends time on them, and to flag damaged ones. Encryption is left to fitz
+(doc.needs_pass): most encrypted files open without a password.
+"""
+import re
+
+VALID = "valid"
+ENCRYPTED = "encrypted"  # found by the extractor, not the pre-flight
+TRUNCATED = "truncated"
+NOT_PDF = "not_pdf"
+
+# Error taxonomy: code -> message of the file's ErrorRecord. The pre-flight
+# codes come first; the rest are found later in the pipeline.
+ERRORS = {
+    NOT_PDF: "Not a PDF (no %PDF- header)",
+    TRUNCATED: "Truncated PDF (no startxref/%%EOF at the end, and fitz could not repair it)",
+    ENCRYPTED: "Encrypted PDF (needs a password)",
+    "read_error": "File could not be read",
+    "parse_error": "PDF could not be parsed",
+    "timeout": "Timed out",
+    "worker_crash": "The worker process died while parsing this file",
+}
+# Pre-flight results that never reach fitz. Truncated files still do: fitz
+# repairs most damaged tails (junk after %%EOF, a stale startxref, a cut-off
+# download), so that code is only given when fitz fails too.
+REJECTED = (NOT_PDF,)
+
+# The spec puts %PDF- in the first 1024 bytes, but fitz skips leading junk
+# of any length; a header further in than this is not looked for
+HEADER_SCAN_BYTES = 1024 * 1024
+TAIL_BYTES = 4096
+STARTXREF_RE = re.compile(rb"startxref\s*\d+")
+PDF_HEADER_RE = re.compile(rb"%PDF-")
+
+def preflight(data):
+    """
+    Classifies PDF bytes (bytes or memoryview) as VALID, TRUNCATED (needs
+    repair) or NOT_PDF; nothing is parsed. Only the last TAIL_BYTES are
+    read, plus the start of the file up to its header (re searches the
+    memoryview in place).
+    """
+    size = len(data)
+    if PDF_HEADER_RE.search(data, 0, HEADER_SCAN_BYTES) is None:
+        return NOT_PDF
+
+    # The file should end with startxref <offset> %%EOF
+    tail = bytes(data[max(0, size - TAIL_BYTES):])
+    at = tail.rfind(b"startxref")
+    if at == -1 or STARTXREF_RE.match(tail, at) is None or b"%%EOF" not in tail[at:]:
+        return TRUNCATED
+    return VALID
+
+class PdfError(Exception):
+    """A file the extractor could not read: `code` is an ERRORS key, `detail` defaults to its message."""
+
+    def __init__(self, code, detail=None):
+        detail = detail or ERRORS[code]
+        super().__init__(code, detail)
+        self.code = code
+        self.detail = detail
@@ -0,0 +1,104 @@
+"""
+Typed result records. A job returns one ResultRow per (file, email) and, for
+a file that failed, one ErrorRecord in meta["error"], so errors never travel
+as rows whose Email column holds an exception message.
+"""
+import array
+import sys
+
+# Column names of the results table and of the exports
+FIELDS = ("File Name", "Exact Title", "Email")
+ERROR_FIELDS = ("File Name", "Error", "Detail")
+OCR_FIELDS = ("File Name",)
+
+class ResultRow:
+    """
+    One output row. File names and titles are interned, so every row of a
+    file (and every file sharing a title) points to one string; __reduce__
+    re-interns them when rows are unpickled in the parent process.
+    """
+    __slots__ = ("file_name", "title", "email")
+
+    def __init__(self, file_name, title, email):
+        self.file_name = sys.intern(file_name)
+        self.title = sys.intern(title)
+        self.email = email
+
+    def __reduce__(self):
+        return ResultRow, (self.file_name, self.title, self.email)
+
+    def as_tuple(self):
+        return self.file_name, self.title, self.email
+
+    def as_dict(self):
+        return dict(zip(FIELDS, self.as_tuple()))
+
+class ErrorRecord:
+    """A file that produced no rows: `code` is a preflight.ERRORS key, `detail` the message."""
+    __slots__ = ("file_name", "code", "detail")
+
+    def __init__(self, file_name, code, detail):
+        self.file_name = file_name
+        self.code = code
+        self.detail = detail
+
+    def __reduce__(self):
+        return ErrorRecord, (self.file_name, self.code, self.detail)
+
+    def as_tuple(self):
+        return self.file_name, self.code, self.detail
+
+    def as_dict(self):
+        return dict(zip(ERROR_FIELDS, self.as_tuple()))
+
+class ResultColumns:
+    """
+    Columnar accumulator of ResultRows for large runs. File names and titles
+    are stored once each, as int32 category codes per row; emails go into
+    one UTF-8 buffer plus int64 end offsets (Arrow's large_string layout).
+    A row costs about 16 bytes plus its email, instead of a Python object.
+    to_frame() wraps these buffers without copying them, after which the
+    accumulator is read-only (appending raises BufferError).
+    """
+
+    def __init__(self):
+        self._file_names = {}  # string -> code; insertion order is code order
+        self._titles = {}
+        self._file_codes = array.array("i")
+        self._title_codes = array.array("i")
+        self._emails = bytearray()
+        self._email_ends = array.array("q", [0])
+
+    def __len__(self):
+        return len(self._file_codes)
+
+    def append(self, row):
+        self._file_codes.append(self._file_names.setdefault(row.file_name, len(self._file_names)))
+        self._title_codes.append(self._titles.setdefault(row.title, len(self._titles)))
+        self._emails += row.email.encode("utf-8")
+        self._email_ends.append(len(self._emails))
+
+    def to_frame(self):
+        """
+        DataFrame with FIELDS columns: categoricals over the code arrays
+        (pandas narrows codes below 32,768 categories, a copy of at most 2
+        bytes per row) and an Arrow-backed email column over the buffer.
+        """
+        # Imported here so pool workers, which create ResultRows, never load pandas
+        import numpy as np
+        import pandas as pd
+        import pyarrow as pa
+
+        emails = pa.Array.from_buffers(
+            pa.large_string(), len(self), [None, pa.py_buffer(self._email_ends), pa.py_buffer(self._emails)]
+        )
+        columns = (
+            pd.Categorical.from_codes(np.frombuffer(self._file_codes, dtype=np.int32), list(self._file_names), validate=False),
+            pd.Categorical.from_codes(np.frombuffer(self._title_codes, dtype=np.int32), list(self._titles), validate=False),
+            pd.arrays.ArrowExtensionArray(emails),
+        )
+        return pd.DataFrame(dict(zip(FIELDS, columns)), copy=False)
+
+def to_records(rows, file_name):
+    """ResultRows of one file's extractor rows (dicts); failures never come as rows."""
+    return [ResultRow(file_name, row["Exact Title"], row["Email"]) for row in rows]
@@ -0,0 +1,287 @@
+import collections
+import concurrent.futures
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from src.core.jobs import Batch, entry_point, job_meta, run_fallback, source_size
+from src.core.pool import JobTimeout
+from src.core.preflight import ERRORS
+from src.core.records import ErrorRecord
+from src.core.transport import shared_submit
+
+MEMINFO_PATH = "/proc/meminfo"
+
+def read_meminfo(path=MEMINFO_PATH):
+    """Parses /proc/meminfo into {field: kB}. Returns {} where it is unavailable (macOS, Windows)."""
+    info = {}
+    try:
+        with open(path) as fh:
+            for line in fh:
+                key, _, value = line.partition(":")
+                info[key] = int(value.split()[0])
+    except (OSError, ValueError, IndexError):
+        return {}
+    return info
+
+class AdaptiveWindow:
+    """
+    Job-count limit that halves while the machine is short of memory
+    (MemAvailable below `min_available` of MemTotal) and grows back one
+    slot at a time once it recovers. /proc/meminfo is read at most every
+    `interval` seconds.
+    """
+
+    def __init__(self, max_jobs, min_available=0.10, interval=0.5):
+        self.max_jobs = max(1, max_jobs)
+        self.min_available = min_available
+        self.interval = interval
+        self.current = self.max_jobs
+        self._checked = 0.0
+
+    def limit(self):
+        now = time.monotonic()
+        if now - self._checked < self.interval:
+            return self.current
+        self._checked = now
+
+        info = read_meminfo()
+        if not info.get("MemTotal") or "MemAvailable" not in info:
+            return self.current
+        available = info["MemAvailable"] / info["MemTotal"]
+        if available < self.min_available:
+            self.current = max(1, self.current // 2)
+        elif available > self.min_available * 2 and self.current < self.max_jobs:
+            self.current += 1
+        return self.current
+
+class MicroBatcher:
+    """
+    Groups runs of small files into Batch jobs so per-task overhead (submit,
+    pickling, future handling) is paid once per batch instead of per file.
+    A batch closes at `max_batch_bytes`, `max_files`, or when its estimated
+    run time reaches `target_seconds`. The estimate is a moving average of
+    seconds per byte, learned from finished batches; until the first one
+    finishes, batches are capped at `initial_files`.
+    """
+
+    def __init__(self, small_bytes=512 * 1024, max_batch_bytes=4 * 1024 * 1024, max_files=64,
+                 target_seconds=0.25, initial_files=8):
+        self.small_bytes = small_bytes
+        self.max_batch_bytes = max_batch_bytes
+        self.max_files = max_files
+        self.target_seconds = target_seconds
+        self.initial_files = initial_files
+        self.seconds_per_byte = None
+
+    def observe(self, nbytes, seconds):
+        """Feeds back the measured run time of a finished batch."""
+        if nbytes <= 0:
+            return
+        rate = seconds / nbytes
+        self.seconds_per_byte = rate if self.seconds_per_byte is None else 0.8 * self.seconds_per_byte + 0.2 * rate
+
+    def _full(self, files, nbytes):
+        if files >= self.max_files or nbytes >= self.max_batch_bytes:
+            return True
+        if self.seconds_per_byte is None:
+            return files >= self.initial_files
+        return nbytes * self.seconds_per_byte >= self.target_seconds
+
+    def group(self, jobs):
+        """Yields large jobs unchanged and small ones as (Batch, label)."""
+        batch, batch_bytes = [], 0
+        for source, name in jobs:
+            size = source_size(source)
+            if size > self.small_bytes:
+                yield source, name
+                continue
+            batch.append((source, name))
+            batch_bytes += size
+            if self._full(len(batch), batch_bytes):
+                yield Batch(batch, batch_bytes), f"{len(batch)} files"
+                batch, batch_bytes = [], 0
+        if batch:
+            yield Batch(batch, batch_bytes), f"{len(batch)} files"
+
+def _merge(fast, slow):
+    """
+    (rows, meta) of a file retried by the slow tier: its rows, both tiers'
+    timings and notes. The fitz rows are kept unless pdfplumber found more.
+    """
+    rows, slow_meta = slow
+    if len(rows) < len(fast[0]):
+        rows = fast[0]
+    stages = dict(fast[1]["stages"])
+    for stage, seconds in slow_meta["stages"].items():
+        stages[stage] = stages.get(stage, 0.0) + seconds
+    return rows, {
+        "stages": stages, "notes": fast[1]["notes"] + slow_meta["notes"], "cache_hit": slow_meta["cache_hit"], "error": None,
+    }
+
+def tiered_submit(submit, fallback_submit):
+    """
+    Wraps submit(source, name) into a two-tier engine. Every file goes to
+    `submit` (fitz) first; files whose result carries the "thin_text" note
+    are resubmitted to `fallback_submit` (pdfplumber, on its own small pool,
+    so slow files never occupy the fast workers). The returned future holds
+    the final (rows, meta), or a list of them for a Batch. If the slow tier
+    fails or cannot parse the file, the fitz result is kept.
+    """
+    def retry(source, fast, done):
+        """Runs `fast`'s file through the slow tier and passes the result to done()."""
+        if "thin_text" not in fast[1]["notes"]:
+            return done(fast)
+        try:
+            future = fallback_submit(*source)
+        except Exception:
+            return done(fast)
+        future.add_done_callback(
+            lambda f: done(fast if f.cancelled() or f.exception() or f.result()[1]["error"] else _merge(fast, f.result()))
+        )
+
+    def submit_tiered(source, name):
+        outer = concurrent.futures.Future()
+        outer.set_running_or_notify_cancel()
+
+        def fast_done(future):
+            exc = concurrent.futures.CancelledError() if future.cancelled() else future.exception()
+            if exc is not None:
+                outer.set_exception(exc)
+            elif not isinstance(source, Batch):
+                retry((source, name), future.result(), outer.set_result)
+            else:
+                # One slow-tier job per thin file of the batch; the batch is done when all are
+                results = list(future.result())
+                left = [len(results)]
+                lock = threading.Lock()
+
+                def done_one(i, result):
+                    with lock:
+                        results[i] = result
+                        left[0] -= 1
+                        finished = not left[0]
+                    if finished:
+                        outer.set_result(results)
+
+                for i, (job, result) in enumerate(zip(source.jobs, results)):
+                    retry(job, result, lambda result, i=i: done_one(i, result))
+
+        submit(source, name).add_done_callback(fast_done)
+        return outer
+    return submit_tiered
+
+def build_submit(submit, fallback_submit=None, exclude_no_email=True, cache_path=None, shared=False, spill_dir=None):
+    """
+    The submit(source, name) that run_windowed takes, built on executor-style
+    submit(fn, *args) callables: files (and Batches) run as jobs.entry_point
+    on `submit` and, given a `fallback_submit`, thin-text files are retried
+    by run_fallback there (tiered_submit). With `shared` (process pools),
+    large PDFs reach the workers through shared memory in `spill_dir`.
+    """
+    tiered = fallback_submit is not None
+    fast = lambda source, name: submit(entry_point(source), source, name, exclude_no_email, cache_path, tiered)
+    if shared:
+        fast = shared_submit(fast, spill_dir)
+    if not tiered:
+        return fast
+    slow = lambda source, name: fallback_submit(run_fallback, source, name, exclude_no_email, cache_path)
+    if shared:
+        slow = shared_submit(slow, spill_dir)
+    return tiered_submit(fast, slow)
+
+def _completed(result=None, exc=None):
+    future = concurrent.futures.Future()
+    if exc is not None:
+        future.set_exception(exc)
+    else:
+        future.set_result(result)
+    return future
+
+def _unbatch(batch, future, batcher):
+    """Splits a finished batch future into one completed future per file."""
+    exc = future.exception() if not future.cancelled() else concurrent.futures.CancelledError()
+    if exc is not None:
+        for _, name in batch.jobs:
+            yield name, _completed(exc=exc)
+        return
+    results = future.result()
+    batcher.observe(batch.size, sum(sum(meta["stages"].values()) for _, meta in results))
+    for (_, name), result in zip(batch.jobs, results):
+        yield name, _completed(result)
+
+def run_windowed(submit, jobs, max_jobs=64, max_bytes=512 * 1024 * 1024, window=None, batcher=None):
+    """
+    Continuous bounded-window scheduler.
+    Keeps up to `max_jobs` jobs in flight, holding at most `max_bytes` of PDF
+    data, and refills the window as each future finishes instead of waiting
+    for a whole chunk. `jobs` yields (source, name); `submit(source, name)`
+    returns a Future. Yields (name, future) per file in completion order.
+    With a MicroBatcher, small files travel as Batch jobs (submit must
+    accept them, see jobs.entry_point) and are handed back one by one. A
+    batch that times out is split and its files are resubmitted one by one,
+    so only the file that actually hangs ends up with a JobTimeout.
+    """
+    window = window or AdaptiveWindow(max_jobs)
+    if batcher is not None:
+        jobs = batcher.group(jobs)
+    pending = {}  # future -> (name or Batch, size)
+    in_flight_bytes = 0
+    job_iter = iter(jobs)
+    retry = collections.deque()  # files of timed-out batches, run on their own
+    next_job = None
+    exhausted = False
+
+    while True:
+        # 1. Refill the window
+        limit = window.limit()
+        while len(pending) < limit:
+            if next_job is None:
+                if retry:
+                    next_job = retry.popleft()
+                elif not exhausted:
+                    next_job = next(job_iter, None)
+                    exhausted = next_job is None
+                if next_job is None:
+                    break
+            size = source_size(next_job[0])
+            # Always admit one job, even if it alone is larger than the byte budget
+            if pending and in_flight_bytes + size > max_bytes:
+                break
+            future = submit(*next_job)
+            pending[future] = (next_job[0] if isinstance(next_job[0], Batch) else next_job[1], size)
+            in_flight_bytes += size
+            next_job = None
+
+        if not pending:
+            return
+
+        # 2. Hand back whatever finished, then loop to refill
+        done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            name, size = pending.pop(future)
+            in_flight_bytes -= size
+            if isinstance(name, Batch):
+                if not future.cancelled() and isinstance(future.exception(), JobTimeout):
+                    retry.extend(name.jobs)
+                    continue
+                yield from _unbatch(name, future, batcher)
+            else:
+                yield name, future
+
+def result_of(future, file_name):
+    """
+    (records, meta) of a finished file future. A job that never returned
+    gets no records and a job_meta() with its ErrorRecord: "timeout" when
+    the watchdog killed it, "worker_crash" when it kept crashing its worker
+    (segfault, OOM kill) past the retry limit, else "parse_error".
+    """
+    try:
+        return future.result()
+    except JobTimeout as exc:
+        error = ErrorRecord(file_name, "timeout", str(exc))
+    except BrokenProcessPool as exc:
+        error = ErrorRecord(file_name, "worker_crash", str(exc) or ERRORS["worker_crash"])
+    except Exception as exc:
+        error = ErrorRecord(file_name, "parse_error", str(exc))
+    return [], job_meta(error=error)
@@ -0,0 +1,98 @@
+import time
+
+# Stage names in pipeline order (used for display)
+STAGES = (
+    "read", "preflight", "cache", "open", "metadata_title", "link_emails", "triage", "page_text", "email_regex", "visual_title", "close",
+    "fallback_text", "fallback_regex",
+)
+# Stages that belong to the pdfplumber tier; everything else after the cache is fitz
+FALLBACK_STAGES = ("fallback_text", "fallback_regex")
+
+class StageTimer:
+    """
+    Lap timer for one file. Each mark(stage) charges the time since the
+    previous mark to that stage, so instrumenting costs one perf_counter()
+    call and one dict update per mark. note(label) records which shortcut
+    a file took (e.g. "zero_text"), so batches can report how often.
+    """
+    __slots__ = ("stages", "notes", "_last")
+
+    def __init__(self):
+        self.stages = {}
+        self.notes = []
+        self._last = time.perf_counter()
+
+    def lap(self):
+        """Restarts the clock without charging anything (e.g. after untimed work)."""
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+    def note(self, label):
+        self.notes.append(label)
+
+class _NullTimer:
+    """Stand-in used when no timer is passed, so the extractor never branches on it."""
+    __slots__ = ()
+
+    def lap(self):
+        pass
+
+    def mark(self, stage):
+        pass
+
+    def note(self, label):
+        pass
+
+NULL_TIMER = _NullTimer()
+
+class BatchTimings:
+    """Aggregates per-file stage dicts (from StageTimer.stages) over a batch."""
+
+    def __init__(self):
+        self.seconds = {}
+        self.files = {}
+        self.notes = {}
+        self.timed_files = 0
+
+    def add(self, stages, notes=()):
+        for label in notes:
+            self.notes[label] = self.notes.get(label, 0) + 1
+        if not stages:
+            return
+        self.timed_files += 1
+        for stage, seconds in stages.items():
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+            self.files[stage] = self.files.get(stage, 0) + 1
+
+    def summary(self):
+        """Rows of stage, total seconds, files that hit the stage, mean ms per file and share of time."""
+        total = sum(self.seconds.values()) or 1.0
+        order = [s for s in STAGES if s in self.seconds] + sorted(set(self.seconds) - set(STAGES))
+        return [
+            {
+                "Stage": stage,
+                "Total (s)": round(self.seconds[stage], 3),
+                "Files": self.files[stage],
+                "Mean (ms)": round(self.seconds[stage] / self.files[stage] * 1000, 3),
+                "Share": f"{self.seconds[stage] / total:.1%}",
+            }
+            for stage in order
+        ]
+
+    def tiers(self):
+        """Files and seconds per extraction tier: fitz for every parsed file, pdfplumber for the retried ones."""
+        fallback = sum(self.seconds.get(stage, 0.0) for stage in FALLBACK_STAGES)
+        before_open = sum(self.seconds.get(stage, 0.0) for stage in ("read", "preflight", "cache"))
+        fitz_seconds = sum(self.seconds.values()) - fallback - before_open
+        rows = []
+        for tier, files, seconds in (
+            ("fitz", self.files.get("open", 0), fitz_seconds),
+            ("pdfplumber", self.files.get("fallback_text", 0), fallback),
+        ):
+            if files:
+                rows.append({"Tier": tier, "Files": files, "Total (s)": round(seconds, 3), "Mean (ms)": round(seconds / files * 1000, 3)})
+        return rows
@@ -0,0 +1,90 @@
+import contextlib
+import mmap
+import os
+import tempfile
+from multiprocessing import shared_memory
+
+# Below this, creating and unlinking a segment costs more than pickling the bytes
+SHARE_THRESHOLD = 1024 * 1024
+
+class SharedPdf:
+    """
+    Picklable handle to PDF bytes the main process placed in shared memory
+    (or, if /dev/shm is full, in a spill file). Only this handle crosses the
+    pipe to a worker process; the bytes are never pickled.
+    """
+    __slots__ = ("name", "path", "size")
+
+    def __init__(self, name, path, size):
+        self.name = name  # shared memory segment, or None
+        self.path = path  # spill file, or None
+        self.size = size
+
+def share_bytes(data, spill_dir=None):
+    """Copies `data` once into a new shared memory segment (spill file as fallback)."""
+    view = memoryview(data).cast("B")
+    size = view.nbytes
+    try:
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    except OSError:
+        with tempfile.NamedTemporaryFile(dir=spill_dir, suffix=".pdf", delete=False) as tmp:
+            tmp.write(view)
+        return SharedPdf(None, tmp.name, size)
+    shm.buf[:size] = view
+    handle = SharedPdf(shm.name, None, size)
+    shm.close()
+    return handle
+
+def release(handle):
+    """Frees the segment or spill file behind a handle. Safe to call more than once."""
+    try:
+        if handle.name:
+            shm = shared_memory.SharedMemory(name=handle.name)
+            shm.close()
+            shm.unlink()
+        elif handle.path:
+            os.remove(handle.path)
+    except FileNotFoundError:
+        pass
+
+@contextlib.contextmanager
+def open_shared(handle):
+    """Worker side: yields a read-only memoryview of the shared PDF, detached again on exit."""
+    if handle.name:
+        shm = shared_memory.SharedMemory(name=handle.name)
+        buf, close = shm.buf, shm.close
+    elif handle.size:
+        with open(handle.path, "rb") as fh:
+            buf = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        close = buf.close
+    else:
+        buf, close = b"", (lambda: None)
+
+    view = memoryview(buf)[:handle.size].toreadonly()
+    del buf
+    try:
+        yield view
+    finally:
+        view.release()
+        close()
+
+def shared_submit(submit, spill_dir=None, min_size=SHARE_THRESHOLD):
+    """
+    Wraps a submit(source, name) callable for process pools: in-memory PDFs
+    of at least `min_size` bytes are moved to shared memory and the handle
+    is submitted instead.
+    The segment is freed when the future finishes, fails (including a crashed
+    worker) or is cancelled. ZIP members and other handles pass through.
+    """
+    def submit_shared(source, name):
+        if not isinstance(source, (bytes, bytearray, memoryview)) or memoryview(source).nbytes < min_size:
+            return submit(source, name)
+        handle = share_bytes(source, spill_dir)
+        try:
+            future = submit(handle, name)
+        except BaseException:
+            release(handle)
+            raise
+        future.add_done_callback(lambda _: release(handle))
+        return future
+    return submit_shared
@@ -1,9 +1,163 @@
-import pandas as pd
+import os
+import struct
+import tempfile
+import zipfile
+import zlib
 from io import BytesIO
 
+# Bounded read size for spills and ZIP members
+READ_CHUNK = 1024 * 1024
+# Inflate step: compressed input and decompressed output held at once stay below 3 x this
+INFLATE_CHUNK = 64 * 1024
+
+# ZIP local file header (APPNOTE 4.3.7): signature ... name length, extra length
+LOCAL_HEADER_FORMAT = "<4s2B4HL2L2H"
+LOCAL_HEADER_SIZE = struct.calcsize(LOCAL_HEADER_FORMAT)
+LOCAL_HEADER_MAGIC = b"PK\x03\x04"
+
 def to_excel(df):
     """Converts a DataFrame to an Excel file in memory."""
+    import pandas as pd  # Imported here so pool workers (which read ZIPs) never load pandas
     output = BytesIO()
     with pd.ExcelWriter(output, engine='openpyxl') as writer:
         df.to_excel(writer, index=False, sheet_name='Extracted Data')
     return output.getvalue()
+
+def spill_to_tempfile(upload, spill_dir, suffix=".zip"):
+    """Writes an uploaded file to disk in READ_CHUNK slices. Returns the path."""
+    # getvalue() shares the upload's bytes; getbuffer() would force a full copy
+    view = memoryview(upload.getvalue())
+    with tempfile.NamedTemporaryFile(dir=spill_dir, suffix=suffix, delete=False) as tmp:
+        for start in range(0, len(view), READ_CHUNK):
+            tmp.write(view[start:start + READ_CHUNK])
+        return tmp.name
+
+class ZipMember:
+    """
+    Picklable pointer to one PDF inside a ZIP on disk. Workers inflate it
+    themselves (read_zip_member), so decompression runs in parallel.
+    """
+    __slots__ = ("path", "info")
+
+    def __init__(self, path, info):
+        self.path = path
+        self.info = info
+
+    @property
+    def size(self):
+        """Uncompressed size, i.e. what the worker will hold in memory."""
+        return self.info.file_size
+
+def _read_exact(src, size):
+    """Reads `size` bytes from a stream into one buffer, READ_CHUNK at a time."""
+    data = bytearray(size)
+    view = memoryview(data)
+    pos = 0
+    while pos < size:
+        n = src.readinto(view[pos:pos + READ_CHUNK])
+        if not n: break
+        pos += n
+    view.release()
+    if pos < size:
+        del data[pos:]
+    return data
+
+def _inflate(fh, info):
+    """Inflates a deflated member into a buffer of its exact size, INFLATE_CHUNK at a time."""
+    data = bytearray(info.file_size)
+    pos = 0
+    remaining = info.compress_size
+    inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+    while remaining:
+        chunk = fh.read(min(INFLATE_CHUNK, remaining))
+        if not chunk: break
+        remaining -= len(chunk)
+        while chunk:
+            out = inflater.decompress(chunk, INFLATE_CHUNK)
+            if pos + len(out) > len(data):
+                raise zipfile.BadZipFile(f"{info.filename} is larger than its declared size")
+            data[pos:pos + len(out)] = out
+            pos += len(out)
+            chunk = inflater.unconsumed_tail
+    out = inflater.flush()
+    data[pos:pos + len(out)] = out
+    pos += len(out)
+    if pos != len(data):
+        raise zipfile.BadZipFile(f"{info.filename} is truncated")
+    return data
+
+def read_zip_member(member):
+    """
+    Reads one member straight from its local header, without re-reading the
+    archive's central directory (which is slow for 100k-member ZIPs).
+    Stored and deflated members go directly into a single exact-size buffer;
+    other methods fall back to zipfile.
+    """
+    info = member.info
+    if info.flag_bits & 0x1:
+        raise RuntimeError(f"File {info.filename!r} is encrypted, password required for extraction")
+    with open(member.path, "rb") as fh:
+        fh.seek(info.header_offset)
+        header = struct.unpack(LOCAL_HEADER_FORMAT, fh.read(LOCAL_HEADER_SIZE))
+        if header[0] != LOCAL_HEADER_MAGIC:
+            raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+        fh.seek(header[10] + header[11], os.SEEK_CUR)  # skip file name + extra field
+
+        if info.compress_type == zipfile.ZIP_STORED:
+            data = _read_exact(fh, info.file_size)
+        elif info.compress_type == zipfile.ZIP_DEFLATED:
+            data = _inflate(fh, info)
+        else:
+            with zipfile.ZipExtFile(fh, "r", info) as src:  # checks the CRC itself
+                return _read_exact(src, info.file_size)
+
+    if zlib.crc32(data) != info.CRC:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for file {info.filename!r}")
+    return data
+
+def iter_zip_members(path):
+    """Yields (ZipMember, name) for every PDF in a ZIP on disk. Only the central directory is read here."""
+    with zipfile.ZipFile(path) as z:
+        for info in z.infolist():
+            if not info.is_dir() and info.filename.lower().endswith(".pdf"):
+                yield ZipMember(path, info), info.filename
+
+def iter_uploaded_pdfs(uploaded_files, spill_dir, on_error=None):
+    """
+    Memory-safe generator over Streamlit uploads, yielding (source, name) one PDF at a time.
+    Plain PDFs come back as bytes. ZIPs are spilled to `spill_dir` once and
+    yielded as ZipMember pointers; the caller removes `spill_dir` after the run.
+    """
+    for f in uploaded_files:
+        if f.name.lower().endswith(".zip"):
+            try:
+                yield from iter_zip_members(spill_to_tempfile(f, spill_dir))
+            except Exception as ze:
+                if on_error is None: raise
+                on_error(f.name, ze)
+        else:
+            yield f.getvalue(), f.name
+
+def iter_pdf_paths(paths, on_error=None):
+    """
+    Walks files, directories and ZIP archives on disk, yielding (source, name)
+    one PDF at a time: bytes for plain files, ZipMember for archive members
+    (named like in the web app). A file or archive that cannot be read goes
+    to on_error(path, exc) and the walk goes on; without on_error it raises.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                yield from iter_pdf_paths((os.path.join(root, f) for f in sorted(files)), on_error)
+            continue
+        try:
+            if path.lower().endswith(".zip"):
+                yield from iter_zip_members(path)
+            elif path.lower().endswith(".pdf"):
+                with open(path, "rb") as fh:
+                    data = fh.read()
+                yield data, path
+        except Exception as exc:
+            if on_error is None: raise
+            on_error(path, exc)
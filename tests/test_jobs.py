@@ -0,0 +1,29 @@
+"""
+run_job errors travel as ErrorRecords in meta, never as rows, so a paper
+titled "Error" is an ordinary result.
+"""
+import fitz
+
+from src.core.jobs import run_job
+
+def paper(title, text):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 100), title, fontsize=28)
+    page.insert_text((72, 140), text, fontsize=11)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def test_title_error_is_a_result(tmp_path):
+    data = paper("Error", "Correspondence: a.b@uni.edu and c.d@lab.org")
+    for cache_hit in (False, True):
+        records, meta = run_job(data, "error.pdf", cache_path=str(tmp_path / "cache.sqlite"))
+        assert meta["error"] is None
+        assert meta["cache_hit"] is cache_hit
+        assert [r.as_tuple() for r in records] == [("error.pdf", "Error", "a.b@uni.edu"), ("error.pdf", "Error", "c.d@lab.org")]
+
+def test_unrepairable_truncated_file_is_an_error_record():
+    records, meta = run_job(b"%PDF-1.7\n" + b"\0" * 64, "broken.pdf")
+    assert records == []
+    assert meta["error"].code == "truncated"
@@ -0,0 +1,34 @@
+"""
+Two-tier extraction: a short page whose only address is a mailto link has
+little text but still gives its row from the fitz tier.
+"""
+import concurrent.futures
+import functools
+
+import fitz
+
+from src.core.jobs import run_fallback, run_job
+from src.core.scheduler import tiered_submit
+
+def mailto_pdf():
+    """One page: a title, "Contact" and a mailto: link, well below MIN_TEXT_CHARS."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 100), "A Study of Things", fontsize=20)
+    page.insert_text((72, 140), "Contact", fontsize=11)
+    page.insert_link({"kind": fitz.LINK_URI, "from": fitz.Rect(72, 128, 130, 142), "uri": "mailto:someone@uni.edu"})
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def test_mailto_page_keeps_its_row():
+    with concurrent.futures.ThreadPoolExecutor(2) as fast, concurrent.futures.ThreadPoolExecutor(1) as slow:
+        submit = tiered_submit(
+            lambda source, name: fast.submit(run_job, source, name, fallback=True),
+            functools.partial(slow.submit, run_fallback),
+        )
+        records, meta = submit(mailto_pdf(), "mailto.pdf").result(timeout=30)
+
+    assert meta["error"] is None
+    assert [r.email for r in records] == ["someone@uni.edu"]
+    assert "fallback_text" not in meta["stages"]